@@ -112,6 +112,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        # A file-backed test database lets concurrency tests use real
+        # per-thread connections.
+        "TEST": {"NAME": os.path.join(BASE_DIR, "test_db.sqlite3")},
     }
 }
 
@@ -8,11 +8,14 @@ from modeltranslation.forms import TranslationModelForm
 from .models import (
     Quiz,
     Progress,
+    ProgressScore,
     Question,
     MCQuestion,
     Choice,
     EssayQuestion,
     Sitting,
+    SittingAnswer,
+    SittingArchive,
 )
 
 
@@ -20,6 +23,13 @@ class ChoiceInline(admin.TabularInline):
     model = Choice
 
 
+class SittingAnswerInline(admin.TabularInline):
+    model = SittingAnswer
+    fields = ("position", "question", "answer", "is_correct")
+    raw_id_fields = ("question",)
+    extra = 0
+
+
 class QuizAdminForm(TranslationModelForm):
     questions = forms.ModelMultipleChoiceField(
         queryset=Question.objects.all().select_subclasses(),
@@ -48,7 +58,22 @@ class QuizAdminForm(TranslationModelForm):
 
 
 class QuizAdmin(TranslationAdmin):
-    pass
+    actions = ["regrade_sittings"]
+
+    @admin.action(description=_("Re-grade completed sittings"))
+    def regrade_sittings(self, request, queryset):
+        sittings = changed = 0
+        for quiz in queryset:
+            batches = Sitting.objects.regrade_quiz(quiz)
+            for _last_pk, batch_sittings, batch_changed in batches:
+                sittings += batch_sittings
+                changed += batch_changed
+        self.message_user(
+            request,
+            _("Re-graded %(sittings)d sittings, %(changed)d answers changed.")
+            % {"sittings": sittings, "changed": changed},
+        )
+
     # form = QuizAdminForm
     # fields = (
     #     "title",
@@ -76,10 +101,13 @@ class MCQuestionAdmin(TranslationAdmin):
 
 
 class ProgressAdmin(admin.ModelAdmin):
-    search_fields = (
-        "user",
-        "score",
-    )
+    search_fields = ("user__username",)
+
+
+class ProgressScoreAdmin(admin.ModelAdmin):
+    list_display = ("user", "quiz", "score", "possible")
+    list_select_related = ("user", "quiz")
+    search_fields = ("user__username", "quiz__title")
 
 
 class EssayQuestionAdmin(admin.ModelAdmin):
@@ -94,8 +122,29 @@ class EssayQuestionAdmin(admin.ModelAdmin):
     filter_horizontal = ("quiz",)
 
 
+class SittingAdmin(admin.ModelAdmin):
+    list_display = ("user", "quiz", "current_score", "complete", "end")
+    list_select_related = ("user", "quiz")
+    inlines = [SittingAnswerInline]
+
+
+class SittingArchiveAdmin(admin.ModelAdmin):
+    list_display = ("user", "quiz", "current_score", "question_count", "end")
+    list_select_related = ("user", "quiz")
+    search_fields = ("user__username", "quiz__title")
+    exclude = ("answers",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 admin.site.register(Quiz, QuizAdmin)
 admin.site.register(MCQuestion, MCQuestionAdmin)
 admin.site.register(Progress, ProgressAdmin)
+admin.site.register(ProgressScore, ProgressScoreAdmin)
 admin.site.register(EssayQuestion, EssayQuestionAdmin)
-admin.site.register(Sitting)
+admin.site.register(Sitting, SittingAdmin)
+admin.site.register(SittingArchive, SittingArchiveAdmin)
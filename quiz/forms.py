@@ -23,6 +23,50 @@ class EssayForm(forms.Form):
         )
 
 
+class QuizForm(forms.Form):
+    """
+    All remaining questions of a sitting, answered in one submission.
+    Unanswered questions are marked incorrect, so a timed quiz can be
+    submitted as it stands when its time runs out.
+    """
+
+    def __init__(self, questions, *args, **kwargs):
+        super(QuizForm, self).__init__(*args, **kwargs)
+        self.questions = questions
+        for question in questions:
+            if isinstance(question, MCQuestion):
+                field = forms.ChoiceField(
+                    choices=question.get_choices_list(),
+                    widget=RadioSelect,
+                    required=False,
+                )
+            else:
+                field = forms.CharField(
+                    widget=Textarea(attrs={"style": "width:100%"}), required=False
+                )
+            self.fields[self.field_name(question)] = field
+
+    @staticmethod
+    def field_name(question):
+        return f"question_{question.id}"
+
+    def question_fields(self):
+        for question in self.questions:
+            yield question, self[self.field_name(question)]
+
+    def answers(self):
+        for question in self.questions:
+            yield question, self.cleaned_data[self.field_name(question)]
+
+
+class QuestionImportForm(forms.Form):
+    file = forms.FileField(label=_("File"))
+    format = forms.ChoiceField(
+        label=_("Format"),
+        choices=(("csv", "CSV"), ("json", _("JSON lines"))),
+    )
+
+
 class QuizAddForm(forms.ModelForm):
     class Meta:
         model = Quiz
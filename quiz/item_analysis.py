@@ -0,0 +1,120 @@
+"""
+Classical item analysis of a quiz's completed sittings.
+
+All marked answers of a quiz are loaded with one query into a
+sitting x question response matrix, and every statistic is computed on
+that matrix at once.
+"""
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from .models import Choice, Question, Sitting, SittingAnswer
+
+
+def get_item_analysis(quiz):
+    """
+    Return the cached item analysis of ``quiz``. The cache key follows the
+    quiz version and a fingerprint of its completed sittings, so edits to
+    questions, new attempts and re-marking all produce fresh statistics.
+    """
+    sittings = Sitting.objects.filter(quiz=quiz, complete=True).aggregate(
+        count=Count("id"), last_end=Max("end"), total_score=Sum("current_score")
+    )
+    last_end = sittings["last_end"].timestamp() if sittings["last_end"] else 0
+    fingerprint = f"{sittings['count']}:{last_end}:{sittings['total_score']}"
+    cache_key = f"quiz:{quiz.pk}:item_analysis:{quiz.cache_version}:{fingerprint}"
+    analysis = cache.get(cache_key)
+    if analysis is None:
+        analysis = analyse_quiz(quiz)
+        cache.set(cache_key, analysis, None)
+    return analysis
+
+
+def analyse_quiz(quiz):
+    rows = list(
+        SittingAnswer.objects.filter(
+            sitting__quiz=quiz, sitting__complete=True, is_correct__isnull=False
+        ).values_list("sitting_id", "question_id", "answer", "is_correct")
+    )
+    if not rows:
+        return {"sittings": 0, "items": []}
+
+    sitting_ids, question_ids, answers, correct = zip(*rows)
+    sittings, row = np.unique(np.array(sitting_ids), return_inverse=True)
+    questions, column = np.unique(np.array(question_ids), return_inverse=True)
+    questions = questions.tolist()
+
+    presented = np.zeros((len(sittings), len(questions)), dtype=bool)
+    scores = np.zeros(presented.shape)
+    presented[row, column] = True
+    scores[row, column] = np.array(correct, dtype=float)
+
+    difficulty, discrimination = item_statistics(presented, scores)
+    choice_counts = count_choices(np.array(answers, dtype=str))
+
+    contents = dict(
+        Question.objects.filter(id__in=questions).values_list("id", "content")
+    )
+    choices = {}
+    for question_id, choice_id, text, is_correct in (
+        Choice.objects.filter(question__in=questions)
+        .order_by("id")
+        .values_list("question_id", "id", "choice_text", "correct")
+    ):
+        choices.setdefault(question_id, []).append((choice_id, text, is_correct))
+
+    responses = presented.sum(axis=0)
+    items = []
+    for index, question_id in enumerate(questions):
+        total = int(responses[index])
+        items.append(
+            {
+                "question_id": question_id,
+                "content": contents.get(question_id, ""),
+                "responses": total,
+                "difficulty": _round(difficulty[index]),
+                "discrimination": _round(discrimination[index]),
+                "choices": [
+                    {
+                        "text": text,
+                        "correct": is_correct,
+                        "count": choice_counts.get(choice_id, 0),
+                        "share": _round(choice_counts.get(choice_id, 0) / total),
+                    }
+                    for choice_id, text, is_correct in choices.get(question_id, [])
+                ],
+            }
+        )
+    return {"sittings": len(sittings), "items": items}
+
+
+def item_statistics(presented, scores):
+    """
+    Return the difficulty (share of correct responses) and discrimination
+    (point-biserial correlation between an item and the rest of the score)
+    of every column of a sitting x question matrix. Questions a sitting did
+    not answer are masked out by ``presented``.
+    """
+    counts = presented.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        difficulty = scores.sum(axis=0) / counts
+
+        rest = (scores.sum(axis=1, keepdims=True) - scores) * presented
+        item_dev = (scores - difficulty) * presented
+        rest_dev = (rest - rest.sum(axis=0) / counts) * presented
+        covariance = (item_dev * rest_dev).sum(axis=0)
+        spread = np.sqrt((item_dev**2).sum(axis=0) * (rest_dev**2).sum(axis=0))
+        discrimination = covariance / spread
+    return difficulty, np.where(spread > 0, discrimination, np.nan)
+
+
+def count_choices(answers):
+    """Count how often each choice id was picked among the given answers."""
+    picked = answers[np.char.isdigit(answers)].astype(np.int64)
+    choice_ids, counts = np.unique(picked, return_counts=True)
+    return dict(zip(choice_ids.tolist(), counts.tolist()))
+
+
+def _round(value):
+    return None if np.isnan(value) else round(float(value), 3)
@@ -0,0 +1,62 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import make_aware
+
+from core.models import Session
+from quiz.models import SittingArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves completed sittings that ended before a session began into the "
+        "compressed sitting archive"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--session",
+            help="Archive sittings completed before this session began "
+            "(defaults to the current session)",
+        )
+        parser.add_argument(
+            "--before",
+            type=datetime.fromisoformat,
+            help="Archive sittings completed before this date (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of sittings archived per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["before"] and options["session"]:
+            raise CommandError("Pass either --session or --before, not both")
+        if options["before"]:
+            cutoff = options["before"]
+        else:
+            sessions = Session.objects.all()
+            if options["session"]:
+                session = sessions.filter(session=options["session"]).first()
+            else:
+                session = sessions.filter(is_current_session=True).first()
+            if session is None:
+                raise CommandError("Session not found")
+            cutoff = datetime.combine(session.created_at, time.min)
+        if cutoff.tzinfo is None:
+            cutoff = make_aware(cutoff)
+
+        archived = 0
+        batches = SittingArchive.objects.archive(
+            cutoff, batch_size=options["batch_size"]
+        )
+        for batch in batches:
+            archived += batch
+            self.stdout.write(f"{archived} sittings archived")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {archived} sittings completed before {cutoff}"
+            )
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+
+from quiz.models import Quiz
+
+
+class Command(BaseCommand):
+    help = "Reports quizzes whose stored question count has drifted and optionally repairs them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Recount the questions of every drifted quiz",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Quiz.objects.annotate(actual=Count("question"))
+            .exclude(question_count=F("actual"))
+            .values_list("pk", "title", "question_count", "actual")
+        )
+        for pk, title, stored, actual in drifted:
+            self.stdout.write(f'Quiz {pk} "{title}": stored {stored}, actual {actual}')
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All question counts are consistent"))
+        elif options["repair"]:
+            Quiz.objects.update_question_counts([row[0] for row in drifted])
+            self.stdout.write(
+                self.style.SUCCESS(f"Repaired {len(drifted)} question counts")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(drifted)} question counts drifted, run with --repair to fix them"
+                )
+            )
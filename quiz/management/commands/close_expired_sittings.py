@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from quiz.models import Sitting
+
+
+class Command(BaseCommand):
+    help = "Completes open sittings whose time limit has run out; run it periodically"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of sittings closed per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        closed = 0
+        for batch in Sitting.objects.close_expired(batch_size=options["batch_size"]):
+            closed += batch
+            self.stdout.write(f"{closed} expired sittings closed")
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} expired sittings"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Quiz
+from quiz.question_bank import WRITERS, export_questions
+
+
+class Command(BaseCommand):
+    help = "Exports the question bank of a quiz as CSV or JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_id", type=int, help="Quiz to export")
+        parser.add_argument(
+            "--format", choices=sorted(WRITERS), default="json", help="File format"
+        )
+        parser.add_argument(
+            "--output", help="File to write to, standard output by default"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            quiz = Quiz.objects.get(pk=options["quiz_id"])
+        except Quiz.DoesNotExist:
+            raise CommandError(f'Quiz {options["quiz_id"]} does not exist')
+
+        chunks = WRITERS[options["format"]](export_questions(quiz))
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as file:
+                file.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
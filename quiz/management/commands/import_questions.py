@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Quiz
+from quiz.question_bank import READERS, QuestionImportError, import_questions
+
+
+class Command(BaseCommand):
+    help = "Imports a CSV or JSON lines question bank into a quiz"
+
+    def add_arguments(self, parser):
+        parser.add_argument("quiz_id", type=int, help="Quiz to add the questions to")
+        parser.add_argument("path", help="Question bank file")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="File format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of questions inserted per batch",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            quiz = Quiz.objects.get(pk=options["quiz_id"])
+        except Quiz.DoesNotExist:
+            raise CommandError(f'Quiz {options["quiz_id"]} does not exist')
+
+        file_format = options["format"] or (
+            "csv" if options["path"].lower().endswith(".csv") else "json"
+        )
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as file:
+                created = import_questions(
+                    quiz, READERS[file_format](file), batch_size=options["batch_size"]
+                )
+        except (OSError, QuestionImportError) as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            self.style.SUCCESS(f'Imported {created} questions into "{quiz}"')
+        )
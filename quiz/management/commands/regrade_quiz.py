@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Quiz, Sitting
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-grades the completed sittings of quizzes against their current answer key"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "quiz_ids", nargs="+", type=int, help="Quiz ids to re-grade"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of sittings re-graded per transaction",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Resume after this sitting id, as reported by an interrupted run",
+        )
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.in_bulk(options["quiz_ids"])
+        missing = set(options["quiz_ids"]) - set(quizzes)
+        if missing:
+            raise CommandError(
+                f"Quiz ids do not exist: {', '.join(map(str, sorted(missing)))}"
+            )
+
+        for quiz_id in options["quiz_ids"]:
+            quiz = quizzes[quiz_id]
+            sittings = changed = 0
+            for last_pk, batch_sittings, batch_changed in Sitting.objects.regrade_quiz(
+                quiz,
+                batch_size=options["batch_size"],
+                start_after=options["start_after"],
+            ):
+                sittings += batch_sittings
+                changed += batch_changed
+                self.stdout.write(
+                    f"{quiz}: {sittings} sittings re-graded, {changed} answers "
+                    f"changed (last sitting id {last_pk})"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Re-graded {sittings} sittings of "{quiz}", {changed} answers changed'
+                )
+            )
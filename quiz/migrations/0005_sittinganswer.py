@@ -0,0 +1,91 @@
+# Generated by Django 5.0.2 on 2026-10-18 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0004_alter_essayquestion_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitting",
+            name="current_position",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Position of the next unanswered question.",
+                verbose_name="Current Position",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="question_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Question Count"),
+        ),
+        migrations.CreateModel(
+            name="SittingAnswer",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveIntegerField(verbose_name="Position")),
+                ("answer", models.TextField(blank=True, verbose_name="User Answer")),
+                (
+                    "is_correct",
+                    models.BooleanField(
+                        help_text="Empty until the question has been answered.",
+                        null=True,
+                        verbose_name="Correct",
+                    ),
+                ),
+                (
+                    "question",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sitting_answers",
+                        to="quiz.question",
+                        verbose_name="Question",
+                    ),
+                ),
+                (
+                    "sitting",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="answers",
+                        to="quiz.sitting",
+                        verbose_name="Sitting",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sitting Answer",
+                "verbose_name_plural": "Sitting Answers",
+                "indexes": [
+                    models.Index(
+                        fields=["sitting", "is_correct"], name="quiz_answer_correct_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="sittinganswer",
+            constraint=models.UniqueConstraint(
+                fields=("sitting", "position"), name="unique_sitting_position"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sittinganswer",
+            constraint=models.UniqueConstraint(
+                fields=("sitting", "question"), name="unique_sitting_question"
+            ),
+        ),
+    ]
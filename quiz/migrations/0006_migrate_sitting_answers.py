@@ -0,0 +1,93 @@
+import json
+
+from django.db import migrations
+
+
+def _split_ids(value):
+    return [int(q) for q in (value or "").split(",") if q.strip()]
+
+
+def _load_answers(value):
+    try:
+        answers = json.loads(value or "{}")
+    except ValueError:
+        return {}
+    return answers if isinstance(answers, dict) else {}
+
+
+def forwards(apps, schema_editor):
+    Question = apps.get_model("quiz", "Question")
+    Sitting = apps.get_model("quiz", "Sitting")
+    SittingAnswer = apps.get_model("quiz", "SittingAnswer")
+
+    existing_ids = set(Question.objects.values_list("id", flat=True))
+    batch = []
+    for sitting in Sitting.objects.order_by("pk").iterator():
+        order = _split_ids(sitting.question_order)
+        remaining = _split_ids(sitting.question_list)
+        incorrect = set(_split_ids(sitting.incorrect_questions))
+        user_answers = _load_answers(sitting.user_answers)
+        current_position = len(order) - len(remaining)
+
+        for position, question_id in enumerate(order):
+            if question_id not in existing_ids:
+                continue
+            answered = (
+                sitting.complete
+                or position < current_position
+                or str(question_id) in user_answers
+            )
+            answer = user_answers.get(str(question_id))
+            batch.append(
+                SittingAnswer(
+                    sitting_id=sitting.pk,
+                    position=position,
+                    question_id=question_id,
+                    answer="" if answer is None else str(answer),
+                    is_correct=(question_id not in incorrect) if answered else None,
+                )
+            )
+
+        Sitting.objects.filter(pk=sitting.pk).update(
+            question_count=len(order), current_position=current_position
+        )
+        if len(batch) >= 1000:
+            SittingAnswer.objects.bulk_create(batch)
+            batch = []
+
+    SittingAnswer.objects.bulk_create(batch)
+
+
+def backwards(apps, schema_editor):
+    Sitting = apps.get_model("quiz", "Sitting")
+    SittingAnswer = apps.get_model("quiz", "SittingAnswer")
+
+    for sitting in Sitting.objects.order_by("pk").iterator():
+        answers = list(
+            SittingAnswer.objects.filter(sitting_id=sitting.pk).order_by("position")
+        )
+        order = [a.question_id for a in answers]
+        remaining = [
+            a.question_id for a in answers if a.position >= sitting.current_position
+        ]
+        incorrect = [a.question_id for a in answers if a.is_correct is False]
+        user_answers = {
+            str(a.question_id): a.answer for a in answers if a.is_correct is not None
+        }
+        Sitting.objects.filter(pk=sitting.pk).update(
+            question_order="".join(f"{q}," for q in order),
+            question_list="".join(f"{q}," for q in remaining),
+            incorrect_questions="".join(f"{q}," for q in incorrect),
+            user_answers=json.dumps(user_answers),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0005_sittinganswer"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,55 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0006_migrate_sitting_answers"),
+    ]
+
+    operations = [
+        # Give the legacy columns a default so the migration can be reversed.
+        migrations.AlterField(
+            model_name="sitting",
+            name="question_order",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=1024,
+                validators=[
+                    django.core.validators.validate_comma_separated_integer_list
+                ],
+                verbose_name="Question Order",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="sitting",
+            name="question_list",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=1024,
+                validators=[
+                    django.core.validators.validate_comma_separated_integer_list
+                ],
+                verbose_name="Question List",
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="incorrect_questions",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="question_list",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="question_order",
+        ),
+        migrations.RemoveField(
+            model_name="sitting",
+            name="user_answers",
+        ),
+    ]
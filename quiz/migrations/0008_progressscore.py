@@ -0,0 +1,64 @@
+# Generated by Django 5.0.2 on 2026-10-18 05:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0007_remove_sitting_csv_fields"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProgressScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.PositiveIntegerField(default=0, verbose_name="Score")),
+                (
+                    "possible",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Possible Score"
+                    ),
+                ),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="quiz.quiz",
+                        verbose_name="Quiz",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="quiz_scores",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Progress Score",
+                "verbose_name_plural": "Progress Scores",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="progressscore",
+            constraint=models.UniqueConstraint(
+                fields=("user", "quiz"), name="unique_progress_score"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+"""
+Progress.score held "quiz,score,possible," entries, but the quiz written was
+always ``str(question.quiz)``, the related manager's "quiz.Quiz.None", so no
+entry can be attributed to a quiz. The legacy scores are therefore not
+carried over to ProgressScore; this migration only reports how many users'
+progress strings are discarded when 0010 drops the column.
+"""
+from django.db import migrations
+
+
+def report_discarded_scores(apps, schema_editor):
+    Progress = apps.get_model("quiz", "Progress")
+    discarded = Progress.objects.exclude(score="").count()
+    if discarded:
+        print(
+            f"\n  Discarding the legacy quiz progress of {discarded} users; "
+            "it was not recorded per quiz and cannot be converted."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0008_progressscore"),
+    ]
+
+    operations = [
+        migrations.RunPython(report_discarded_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0009_migrate_progress_scores"),
+    ]
+
+    operations = [
+        # Give the legacy column a default so the migration can be reversed.
+        migrations.AlterField(
+            model_name="progress",
+            name="score",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=1024,
+                validators=[
+                    django.core.validators.validate_comma_separated_integer_list
+                ],
+                verbose_name="Score",
+            ),
+        ),
+        migrations.RemoveField(
+            model_name="progress",
+            name="score",
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.2 on 2026-10-18 05:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def delete_duplicate_open_sittings(apps, schema_editor):
+    """
+    Keep the most advanced open sitting per (user, quiz, course) and delete
+    the abandoned duplicates so the constraint can be added.
+    """
+    Sitting = apps.get_model("quiz", "Sitting")
+    duplicates = (
+        Sitting.objects.filter(complete=False)
+        .values("user_id", "quiz_id", "course_id")
+        .annotate(open_count=Count("pk"))
+        .filter(open_count__gt=1)
+    )
+    for group in duplicates:
+        sittings = Sitting.objects.filter(
+            complete=False,
+            user_id=group["user_id"],
+            quiz_id=group["quiz_id"],
+            course_id=group["course_id"],
+        ).order_by("-current_position", "pk")
+        keep = sittings.first()
+        sittings.exclude(pk=keep.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0006_grade"),
+        ("quiz", "0010_remove_progress_score"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_open_sittings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="sitting",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("complete", False)),
+                fields=("user", "quiz", "course"),
+                name="unique_open_sitting",
+            ),
+        ),
+    ]
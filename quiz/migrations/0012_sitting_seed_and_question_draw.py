@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-18 05:54
+
+import quiz.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0011_unique_open_sitting"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="questions_per_attempt",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="If set, each attempt draws this many questions at random from the quiz's question pool.",
+                null=True,
+                verbose_name="Questions per attempt",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="seed",
+            field=models.PositiveIntegerField(
+                default=quiz.models.new_sitting_seed,
+                help_text="Seeds the question and choice order of this attempt.",
+                verbose_name="Seed",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.2 on 2026-10-18 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0012_sitting_seed_and_question_draw"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="single_page",
+            field=models.BooleanField(
+                default=False,
+                help_text="If yes, all questions are shown on one page and submitted together.",
+                verbose_name="Single page",
+            ),
+        ),
+    ]
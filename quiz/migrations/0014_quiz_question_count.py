@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_questions(apps, schema_editor):
+    Quiz = apps.get_model("quiz", "Quiz")
+    Question = apps.get_model("quiz", "Question")
+    counts = (
+        Question.quiz.through.objects.filter(quiz_id=OuterRef("pk"))
+        .values("quiz_id")
+        .annotate(count=Count("question_id"))
+        .values("count")
+    )
+    Quiz.objects.update(question_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0013_quiz_single_page"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="question_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Question Count"
+            ),
+        ),
+        migrations.RunPython(count_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0006_grade"),
+        ("quiz", "0014_quiz_question_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="time_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Minutes allowed for each attempt. Leave empty for no limit.",
+                null=True,
+                verbose_name="Time limit",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sitting",
+            name="deadline",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the quiz's time limit runs out for this attempt.",
+                null=True,
+                verbose_name="Deadline",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                condition=models.Q(("complete", False)),
+                fields=["deadline"],
+                name="quiz_open_deadline_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:17
+
+import django.db.models.deletion
+import quiz.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0006_grade"),
+        ("quiz", "0015_timed_quizzes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SittingArchive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sitting_id",
+                    models.PositiveBigIntegerField(unique=True, verbose_name="Sitting"),
+                ),
+                (
+                    "question_count",
+                    models.PositiveIntegerField(verbose_name="Question Count"),
+                ),
+                ("current_score", models.IntegerField(verbose_name="Score")),
+                ("seed", models.PositiveIntegerField(verbose_name="Seed")),
+                ("start", models.DateTimeField(verbose_name="Start")),
+                ("end", models.DateTimeField(verbose_name="End")),
+                ("answers", models.BinaryField(verbose_name="Answers")),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Archived"),
+                ),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="course.course",
+                        verbose_name="Course",
+                    ),
+                ),
+                (
+                    "quiz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="quiz.quiz",
+                        verbose_name="Quiz",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Archived Sitting",
+                "verbose_name_plural": "Archived Sittings",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-end"], name="quiz_archive_user_end_idx"
+                    )
+                ],
+            },
+            bases=(quiz.models.SittingResultMixin, models.Model),
+        ),
+    ]
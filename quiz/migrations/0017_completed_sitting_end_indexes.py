@@ -0,0 +1,32 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("course", "0006_grade"),
+        ("quiz", "0016_sitting_archive"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                condition=models.Q(("complete", True)),
+                fields=["-end", "-id"],
+                name="quiz_complete_end_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sitting",
+            index=models.Index(
+                condition=models.Q(("complete", True)),
+                fields=["user", "-end", "-id"],
+                name="quiz_user_complete_end_idx",
+            ),
+        ),
+    ]
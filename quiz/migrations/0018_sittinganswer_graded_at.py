@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0017_completed_sitting_end_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sittinganswer",
+            name="graded_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a lecturer last marked this answer.",
+                null=True,
+                verbose_name="Graded",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sittinganswer",
+            index=models.Index(
+                condition=models.Q(("graded_at__isnull", True)),
+                fields=["question", "id"],
+                name="quiz_answer_ungraded_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quiz", "0018_sittinganswer_graded_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="cache_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
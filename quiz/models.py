@@ -1,15 +1,39 @@
 import json
-import re
+import math
+import random
+import zlib
+from bisect import bisect_left
+from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured, ValidationError
-from django.core.validators import (
-    MaxValueValidator,
-    validate_comma_separated_integer_list,
+from django.core.validators import MaxValueValidator
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Floor, Greatest, Least
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
 )
-from django.db import models
-from django.db.models import Q
-from django.db.models.signals import pre_save
 from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
@@ -18,6 +42,12 @@ from model_utils.managers import InheritanceManager
 
 from course.models import Course
 from core.utils import unique_slug_generator
+from .utils import (
+    DEADLINE_GRACE,
+    PRACTICE_DEADLINE_GRACE,
+    ROLLUP_CACHE_TIMEOUT,
+    SITTING_CACHE_TIMEOUT,
+)
 
 CHOICE_ORDER_OPTIONS = (
     ("content", _("Content")),
@@ -32,7 +62,32 @@ CATEGORY_OPTIONS = (
 )
 
 
-class QuizManager(models.Manager):
+class QuizQuerySet(models.QuerySet):
+    def with_user_attempts(self, user):
+        """
+        Annotate every quiz with ``user``'s attempts: ``attempts`` (completed,
+        archived ones included), ``best_score``, ``in_progress`` and whether a
+        single-attempt quiz is ``locked``, all computed in the same query.
+        """
+        sittings = Sitting.objects.filter(quiz=OuterRef("pk"), user=user)
+        completed = sittings.filter(complete=True)
+        archived = SittingArchive.objects.filter(quiz=OuterRef("pk"), user=user)
+        return self.annotate(
+            attempts=_subquery_aggregate(completed, Count("pk"))
+            + _subquery_aggregate(archived, Count("pk")),
+            best_score=Greatest(
+                _subquery_aggregate(completed, Max("current_score")),
+                _subquery_aggregate(archived, Max("current_score")),
+            ),
+            in_progress=Exists(sittings.filter(complete=False)),
+        ).annotate(
+            locked=ExpressionWrapper(
+                Q(single_attempt=True, attempts__gt=0), output_field=BooleanField()
+            ),
+        )
+
+
+class QuizManager(models.Manager.from_queryset(QuizQuerySet)):
     def search(self, query=None):
         queryset = self.get_queryset()
         if query:
@@ -45,6 +100,31 @@ class QuizManager(models.Manager):
             queryset = queryset.filter(or_lookup).distinct()
         return queryset
 
+    def update_question_counts(self, quiz_ids=None):
+        """
+        Recount ``question_count`` from the quiz/question link table for the
+        given quizzes, or for every quiz, with a single UPDATE.
+        """
+        queryset = self.get_queryset()
+        if quiz_ids is not None:
+            queryset = queryset.filter(pk__in=quiz_ids)
+        counts = (
+            Question.quiz.through.objects.filter(quiz_id=OuterRef("pk"))
+            .values("quiz_id")
+            .annotate(count=Count("question_id"))
+            .values("count")
+        )
+        return queryset.update(question_count=Coalesce(Subquery(counts), 0))
+
+    def bump_cache_versions(self, quiz_ids):
+        """
+        Invalidate every cache entry derived from the given quizzes. The
+        version lives on the quiz row so every worker sees the change.
+        """
+        return self.filter(pk__in=set(quiz_ids)).update(
+            cache_version=F("cache_version") + 1
+        )
+
 
 class Quiz(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -61,6 +141,13 @@ class Quiz(models.Model):
         verbose_name=_("Random Order"),
         help_text=_("Display the questions in a random order or as they are set?"),
     )
+    single_page = models.BooleanField(
+        default=False,
+        verbose_name=_("Single page"),
+        help_text=_(
+            "If yes, all questions are shown on one page and submitted together."
+        ),
+    )
     answers_at_end = models.BooleanField(
         default=False,
         verbose_name=_("Answers at end"),
@@ -86,6 +173,28 @@ class Quiz(models.Model):
         validators=[MaxValueValidator(100)],
         help_text=_("Percentage required to pass exam."),
     )
+    time_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Time limit"),
+        help_text=_("Minutes allowed for each attempt. Leave empty for no limit."),
+    )
+    questions_per_attempt = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Questions per attempt"),
+        help_text=_(
+            "If set, each attempt draws this many questions at random from the quiz's question pool."
+        ),
+    )
+    question_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Question Count"),
+    )
+    # Embedded in the key of every cache entry derived from the quiz's
+    # questions and choices, and bumped by their signals to invalidate them.
+    cache_version = models.PositiveIntegerField(default=0, editable=False)
     draft = models.BooleanField(
         default=False,
         verbose_name=_("Draft"),
@@ -111,14 +220,54 @@ class Quiz(models.Model):
         if not (0 <= self.pass_mark <= 100):
             raise ValidationError(_("Pass mark must be between 0 and 100."))
 
+        if not self._state.adding and not args and "update_fields" not in kwargs:
+            # question_count and cache_version are kept up to date by the
+            # question signals; never overwrite them with stale in-memory values.
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("question_count", "cache_version")
+            ]
         super().save(*args, **kwargs)
 
     def get_questions(self):
         return self.question_set.all().select_subclasses()
 
+    @property
+    def buffers_answers(self):
+        """
+        Practice attempts are thrown away once they are marked, so their
+        answers are kept in the student's session and only written at
+        checkpoints.
+        """
+        return (
+            self.category == "practice" and not self.exam_paper and not self.single_page
+        )
+
     @property
     def get_max_score(self):
-        return self.get_questions().count()
+        return self.question_count
+
+    def get_answer_key(self):
+        """
+        Return a mapping of multiple choice question id to the set of its
+        correct choice ids, built with one query and cached until a question
+        or choice of the quiz changes.
+        """
+        cache_key = f"quiz:{self.pk}:answer_key:{self.cache_version}"
+        answer_key = cache.get(cache_key)
+        if answer_key is None:
+            answer_key = {}
+            choices = Choice.objects.filter(question__quiz=self).values_list(
+                "question_id", "id", "correct"
+            )
+            for question_id, choice_id, correct in choices:
+                correct_ids = answer_key.setdefault(question_id, set())
+                if correct:
+                    correct_ids.add(choice_id)
+            cache.set(cache_key, answer_key, None)
+        return answer_key
 
     def get_absolute_url(self):
         return reverse("quiz_index", kwargs={"slug": self.course.slug})
@@ -132,7 +281,7 @@ def quiz_pre_save_receiver(sender, instance, **kwargs):
 
 class ProgressManager(models.Manager):
     def new_progress(self, user):
-        new_progress = self.create(user=user, score="")
+        new_progress = self.create(user=user)
         return new_progress
 
 
@@ -140,11 +289,6 @@ class Progress(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, verbose_name=_("User"), on_delete=models.CASCADE
     )
-    score = models.CharField(
-        max_length=1024,
-        verbose_name=_("Score"),
-        validators=[validate_comma_separated_integer_list],
-    )
 
     objects = ProgressManager()
 
@@ -153,46 +297,201 @@ class Progress(models.Model):
         verbose_name_plural = _("User progress records")
 
     def list_all_cat_scores(self):
-        return {}  # Implement as needed
-
-    def update_score(self, question, score_to_add=0, possible_to_add=0):
+        """
+        Return ``{category: [correct, incorrect, percent]}`` for the user,
+        aggregated over their per-quiz scores in a single query.
+        """
+        categories = dict(CATEGORY_OPTIONS)
+        totals = (
+            ProgressScore.objects.filter(user=self.user)
+            .values("quiz__category")
+            .annotate(score=Sum("score"), possible=Sum("possible"))
+            .order_by("quiz__category")
+        )
+        cat_scores = {}
+        for row in totals:
+            category = categories.get(row["quiz__category"]) or _("Other")
+            percent = (
+                int(round(row["score"] / row["possible"] * 100))
+                if row["possible"]
+                else 0
+            )
+            cat_scores[category] = [
+                row["score"],
+                row["possible"] - row["score"],
+                percent,
+            ]
+        return cat_scores
+
+    def update_score(self, quiz, score_to_add=0, possible_to_add=0):
         if not isinstance(score_to_add, int) or not isinstance(possible_to_add, int):
             return _("Error"), _("Invalid score values.")
 
-        to_find = re.escape(str(question.quiz)) + r",(?P<score>\d+),(?P<possible>\d+),"
-        match = re.search(to_find, self.score, re.IGNORECASE)
+        ProgressScore.objects.add_score(
+            self.user, quiz, abs(score_to_add), abs(possible_to_add)
+        )
 
-        if match:
-            updated_score = int(match.group("score")) + abs(score_to_add)
-            updated_possible = int(match.group("possible")) + abs(possible_to_add)
-            new_score = ",".join(
-                [str(question.quiz), str(updated_score), str(updated_possible), ""]
+    def show_exams(self):
+        exams = Sitting.objects.filter(complete=True).select_related("user", "quiz")
+        if not self.user.is_superuser:
+            exams = exams.filter(user=self.user)
+        return exams.order_by("-end", "-pk")
+
+    def show_archived_exams(self):
+        archived = SittingArchive.objects.select_related("quiz").defer("answers")
+        if not self.user.is_superuser:
+            archived = archived.filter(user=self.user)
+        return archived.order_by("-end")
+
+    def exam_rollup(self):
+        """
+        Return per-quiz totals of the completed and archived sittings shown
+        on this progress page, computed with one grouped query per table and
+        cached for ``ROLLUP_CACHE_TIMEOUT``.
+        """
+        scope = "all" if self.user.is_superuser else self.user_id
+        cache_key = f"quiz:progress:{scope}:rollup"
+        rollup = cache.get(cache_key)
+        if rollup is not None:
+            return rollup
+
+        totals = {}
+        for queryset in (
+            Sitting.objects.filter(complete=True),
+            SittingArchive.objects.all(),
+        ):
+            if not self.user.is_superuser:
+                queryset = queryset.filter(user=self.user)
+            rows = (
+                annotate_result(queryset)
+                .values("quiz_id", "quiz__title")
+                .annotate(
+                    sittings=Count("pk"),
+                    passed_count=Count("pk", filter=Q(passed=True)),
+                    percent_total=Sum("percent"),
+                )
+                .order_by()
             )
-            self.score = self.score.replace(match.group(), new_score)
-            self.save()
-        else:
-            self.score += ",".join(
-                [str(question.quiz), str(score_to_add), str(possible_to_add), ""]
+            for row in rows:
+                total = totals.setdefault(
+                    row["quiz_id"],
+                    {
+                        "quiz": row["quiz__title"],
+                        "sittings": 0,
+                        "passed": 0,
+                        "percent": 0,
+                    },
+                )
+                total["sittings"] += row["sittings"]
+                total["passed"] += row["passed_count"]
+                total["percent"] += row["percent_total"]
+
+        rollup = []
+        for total in sorted(totals.values(), key=lambda total: total["quiz"]):
+            rollup.append(
+                {
+                    "quiz": total["quiz"],
+                    "sittings": total["sittings"],
+                    "passed": total["passed"],
+                    "pass_rate": round(total["passed"] * 100 / total["sittings"]),
+                    "average": round(total["percent"] / total["sittings"]),
+                }
             )
-            self.save()
+        cache.set(cache_key, rollup, ROLLUP_CACHE_TIMEOUT)
+        return rollup
+
+
+class ProgressScoreManager(models.Manager):
+    def add_score(self, user, quiz, score_to_add=0, possible_to_add=0):
+        """
+        Increment the user's cumulative score for a quiz in the database, so
+        concurrent attempts never overwrite each other.
+        """
+        changes = {
+            "score": F("score") + score_to_add,
+            "possible": F("possible") + possible_to_add,
+        }
+        if self.filter(user=user, quiz=quiz).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    user=user, quiz=quiz, score=score_to_add, possible=possible_to_add
+                )
+        except IntegrityError:
+            self.filter(user=user, quiz=quiz).update(**changes)
 
-    def show_exams(self):
-        if self.user.is_superuser:
-            return Sitting.objects.filter(complete=True).order_by("-end")
-        else:
-            return Sitting.objects.filter(user=self.user, complete=True).order_by(
-                "-end"
-            )
 
+class ProgressScore(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name="quiz_scores",
+        verbose_name=_("User"),
+        on_delete=models.CASCADE,
+    )
+    quiz = models.ForeignKey(Quiz, verbose_name=_("Quiz"), on_delete=models.CASCADE)
+    score = models.PositiveIntegerField(default=0, verbose_name=_("Score"))
+    possible = models.PositiveIntegerField(default=0, verbose_name=_("Possible Score"))
+
+    objects = ProgressScoreManager()
+
+    class Meta:
+        verbose_name = _("Progress Score")
+        verbose_name_plural = _("Progress Scores")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "quiz"], name="unique_progress_score"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quiz}: {self.score}/{self.possible}"
+
+
+def new_sitting_seed():
+    return random.getrandbits(31)
+
+
+class SittingQuerySet(models.QuerySet):
+    def with_summary(self):
+        """
+        Select the user, quiz and course of each sitting and annotate its
+        ``percent`` and ``passed`` in SQL, for listing many sittings at once.
+        """
+        return annotate_result(self.select_related("user", "quiz", "course"))
+
+    def before(self, end, pk):
+        """Keyset filter for sittings ordered by ``("-end", "-pk")``."""
+        return self.filter(Q(end__lt=end) | Q(end=end, pk__lt=pk))
+
+
+def annotate_result(queryset):
+    """
+    Annotate the ``percent`` and ``passed`` of sittings or archived sittings,
+    rounded and clamped like ``SittingResultMixin.get_percent_correct``.
+    """
+    percent = Floor(F("current_score") * 100.0 / F("question_count") + 0.5)
+    return queryset.annotate(
+        percent=Case(
+            When(question_count=0, then=Value(0)),
+            default=Cast(Greatest(Least(percent, 100), 0), IntegerField()),
+            output_field=IntegerField(),
+        )
+    ).annotate(
+        passed=ExpressionWrapper(
+            Q(percent__gte=F("quiz__pass_mark")), output_field=BooleanField()
+        )
+    )
 
-class SittingManager(models.Manager):
-    def new_sitting(self, user, quiz, course):
-        if quiz.random_order:
-            question_set = quiz.question_set.all().select_subclasses().order_by("?")
-        else:
-            question_set = quiz.question_set.all().select_subclasses()
 
-        question_ids = [item.id for item in question_set]
+class SittingManager(models.Manager.from_queryset(SittingQuerySet)):
+    def new_sitting(self, user, quiz, course):
+        seed = new_sitting_seed()
+        question_ids = list(
+            Question.quiz.through.objects.filter(quiz=quiz)
+            .order_by("question_id")
+            .values_list("question_id", flat=True)
+        )
         if not question_ids:
             raise ImproperlyConfigured(
                 _(
@@ -200,39 +499,157 @@ class SittingManager(models.Manager):
                 )
             )
 
-        questions = ",".join(map(str, question_ids)) + ","
-
-        new_sitting = self.create(
-            user=user,
-            quiz=quiz,
-            course=course,
-            question_order=questions,
-            question_list=questions,
-            incorrect_questions="",
-            current_score=0,
-            complete=False,
-            user_answers="{}",
-        )
+        rng = random.Random(seed)
+        draw = quiz.questions_per_attempt
+        if draw and draw < len(question_ids):
+            drawn = rng.sample(range(len(question_ids)), draw)
+            if not quiz.random_order:
+                drawn.sort()
+            question_ids = [question_ids[index] for index in drawn]
+        elif quiz.random_order:
+            rng.shuffle(question_ids)
+
+        questions_by_id = {
+            question.id: question
+            for question in Question.objects.filter(
+                id__in=question_ids
+            ).select_subclasses()
+        }
+        questions = [questions_by_id[id] for id in question_ids]
+
+        with transaction.atomic():
+            new_sitting = self.create(
+                user=user,
+                quiz=quiz,
+                course=course,
+                seed=seed,
+                deadline=(
+                    now() + timedelta(minutes=quiz.time_limit)
+                    if quiz.time_limit
+                    else None
+                ),
+                question_count=len(question_ids),
+                current_score=0,
+                complete=False,
+            )
+            SittingAnswer.objects.bulk_create(
+                SittingAnswer(sitting=new_sitting, position=position, question_id=id)
+                for position, id in enumerate(question_ids)
+            )
+
+        for position, question in enumerate(questions):
+            question.position = position
+        new_sitting.cache_questions(questions)
         return new_sitting
 
     def user_sitting(self, user, quiz, course):
-        if (
-            quiz.single_attempt
-            and self.filter(user=user, quiz=quiz, course=course, complete=True).exists()
+        if quiz.single_attempt and (
+            self.filter(user=user, quiz=quiz, course=course, complete=True).exists()
+            or SittingArchive.objects.filter(
+                user=user, quiz=quiz, course=course
+            ).exists()
         ):
             return False
         try:
             sitting = self.get(user=user, quiz=quiz, course=course, complete=False)
         except Sitting.DoesNotExist:
-            sitting = self.new_sitting(user, quiz, course)
-        except Sitting.MultipleObjectsReturned:
-            sitting = self.filter(
-                user=user, quiz=quiz, course=course, complete=False
-            ).first()
+            try:
+                return self.new_sitting(user, quiz, course)
+            except IntegrityError:
+                # A concurrent request opened the sitting first; the
+                # unique_open_sitting constraint guarantees there is only one.
+                sitting = self.get(user=user, quiz=quiz, course=course, complete=False)
+        sitting.quiz = quiz
         return sitting
 
+    def close_expired(self, batch_size=1000):
+        """
+        Complete every open sitting whose deadline has passed, ending it at
+        its deadline. Practice sittings, whose answers are buffered in the
+        student's session, are only closed after ``PRACTICE_DEADLINE_GRACE``.
+        Sittings are closed ``batch_size`` at a time with one UPDATE per
+        batch; yields the number closed by each batch.
+        """
+        buffered = Q(
+            quiz__category="practice", quiz__exam_paper=False, quiz__single_page=False
+        )
+        expired = self.filter(complete=False).filter(
+            Q(deadline__lte=now() - DEADLINE_GRACE) & ~buffered
+            | Q(deadline__lte=now() - PRACTICE_DEADLINE_GRACE) & buffered
+        )
+        while True:
+            sitting_ids = list(
+                expired.order_by("deadline").values_list("pk", flat=True)[:batch_size]
+            )
+            if not sitting_ids:
+                return
+            yield self.filter(pk__in=sitting_ids, complete=False).update(
+                complete=True, end=F("deadline")
+            )
+
+    def regrade_quiz(self, quiz, batch_size=500, start_after=0):
+        """
+        Re-mark the completed sittings of ``quiz`` against its current answer
+        key in batches of ``batch_size``, walking the sittings by primary key
+        from ``start_after``. Each batch is committed on its own and yields
+        ``(last_pk, sittings, changed_answers)`` so an interrupted run can be
+        resumed from the last reported primary key.
+        """
+        answer_key = quiz.get_answer_key()
+        last_pk = start_after
+        while True:
+            sitting_ids = list(
+                self.filter(quiz=quiz, complete=True, pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not sitting_ids:
+                return
+            answers = SittingAnswer.objects.filter(
+                sitting_id__in=sitting_ids,
+                question_id__in=answer_key,
+                is_correct__isnull=False,
+            ).only("id", "sitting_id", "question_id", "answer", "is_correct")
+            changed, deltas = regrade_answers(answers, answer_key)
+            with transaction.atomic():
+                save_regraded_answers(changed, deltas)
+            last_pk = sitting_ids[-1]
+            yield last_pk, len(sitting_ids), len(changed)
+
+
+class SittingResultMixin:
+    """Score summary shared by live and archived sittings."""
+
+    @property
+    def get_current_score(self):
+        return self.current_score
+
+    @property
+    def get_max_score(self):
+        return self.question_count
+
+    @property
+    def get_percent_correct(self):
+        if self.question_count == 0:
+            return 0
+        # Halves round up, as in annotate_result; round() would round them
+        # to even and disagree with the listings.
+        percent = math.floor(self.current_score * 100 / self.question_count + 0.5)
+        return min(max(percent, 0), 100)
 
-class Sitting(models.Model):
+    @property
+    def check_if_passed(self):
+        return self.get_percent_correct >= self.quiz.pass_mark
+
+    @property
+    def result_message(self):
+        if self.check_if_passed:
+            return _("You have passed this quiz, congratulations!")
+        else:
+            return _("You failed this quiz, try again.")
+
+
+class Sitting(SittingResultMixin, models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, verbose_name=_("User"), on_delete=models.CASCADE
     )
@@ -240,133 +657,558 @@ class Sitting(models.Model):
     course = models.ForeignKey(
         Course, verbose_name=_("Course"), on_delete=models.CASCADE
     )
-    question_order = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question Order"),
-        validators=[validate_comma_separated_integer_list],
-    )
-    question_list = models.CharField(
-        max_length=1024,
-        verbose_name=_("Question List"),
-        validators=[validate_comma_separated_integer_list],
+    question_count = models.PositiveIntegerField(
+        default=0, verbose_name=_("Question Count")
     )
-    incorrect_questions = models.CharField(
-        max_length=1024,
-        blank=True,
-        verbose_name=_("Incorrect questions"),
-        validators=[validate_comma_separated_integer_list],
+    current_position = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Current Position"),
+        help_text=_("Position of the next unanswered question."),
     )
     current_score = models.IntegerField(verbose_name=_("Current Score"))
-    complete = models.BooleanField(default=False, verbose_name=_("Complete"))
-    user_answers = models.TextField(
-        blank=True, default="{}", verbose_name=_("User Answers")
+    seed = models.PositiveIntegerField(
+        default=new_sitting_seed,
+        verbose_name=_("Seed"),
+        help_text=_("Seeds the question and choice order of this attempt."),
     )
+    complete = models.BooleanField(default=False, verbose_name=_("Complete"))
     start = models.DateTimeField(auto_now_add=True, verbose_name=_("Start"))
     end = models.DateTimeField(null=True, blank=True, verbose_name=_("End"))
+    deadline = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Deadline"),
+        help_text=_("When the quiz's time limit runs out for this attempt."),
+    )
 
     objects = SittingManager()
 
     class Meta:
         permissions = (("view_sittings", _("Can see completed exams.")),)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "quiz", "course"],
+                condition=Q(complete=False),
+                name="unique_open_sitting",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["deadline"],
+                condition=Q(complete=False),
+                name="quiz_open_deadline_idx",
+            ),
+            models.Index(
+                fields=["-end", "-id"],
+                condition=Q(complete=True),
+                name="quiz_complete_end_idx",
+            ),
+            models.Index(
+                fields=["user", "-end", "-id"],
+                condition=Q(complete=True),
+                name="quiz_user_complete_end_idx",
+            ),
+        ]
+
+    @property
+    def questions_cache_key(self):
+        return f"quiz:sitting:{self.pk}:questions:{self.quiz.cache_version}"
+
+    def cache_questions(self, questions=None):
+        """
+        Store the sitting's questions, resolved to their subclasses and with
+        their choices preloaded, in the cache for the rest of the attempt.
+        """
+        if questions is None:
+            questions = list(
+                Question.objects.filter(sitting_answers__sitting=self)
+                .annotate(position=F("sitting_answers__position"))
+                .order_by("position")
+                .select_subclasses()
+            )
+        prefetch_choices(questions, seed=self.seed)
+        cache.set(self.questions_cache_key, questions, SITTING_CACHE_TIMEOUT)
+        return questions
+
+    def get_cached_questions(self):
+        questions = cache.get(self.questions_cache_key)
+        if questions is None:
+            questions = self.cache_questions()
+        return questions
 
     def get_first_question(self):
-        if not self.question_list:
+        questions = self.get_cached_questions()
+        positions = [question.position for question in questions]
+        index = bisect_left(positions, self.current_position)
+        if index == len(questions):
             return False
-        first_question_id = int(self.question_list.split(",", 1)[0])
-        return Question.objects.get_subclass(id=first_question_id)
+        return questions[index]
 
     def remove_first_question(self):
-        if not self.question_list:
+        question = self.get_first_question()
+        if not question:
             return
-        _, remaining_questions = self.question_list.split(",", 1)
-        self.question_list = remaining_questions
+        self.current_position = question.position + 1
         self.save()
 
     def add_to_score(self, points):
         self.current_score += int(points)
-        self.save()
-
-    @property
-    def get_current_score(self):
-        return self.current_score
-
-    def _question_ids(self):
-        return [int(q) for q in self.question_order.split(",") if q]
-
-    @property
-    def get_percent_correct(self):
-        total_questions = len(self._question_ids())
-        if total_questions == 0:
-            return 0
-        percent = (self.current_score / total_questions) * 100
-        return min(max(int(round(percent)), 0), 100)
+        Sitting.objects.filter(pk=self.pk).update(
+            current_score=F("current_score") + int(points)
+        )
 
     def mark_quiz_complete(self):
+        """
+        Complete the sitting without writing back the in-memory score, which
+        may miss answers recorded by other requests since it was loaded.
+        """
         self.complete = True
         self.end = now()
-        self.save()
+        Sitting.objects.filter(pk=self.pk).update(complete=True, end=self.end)
+        self.refresh_from_db(fields=["current_score"])
+
+    @property
+    def is_expired(self):
+        return self.deadline is not None and now() >= self.deadline + DEADLINE_GRACE
+
+    @property
+    def seconds_remaining(self):
+        if self.deadline is None:
+            return None
+        return max(int((self.deadline - now()).total_seconds()), 0)
 
     def add_incorrect_question(self, question):
-        incorrect_ids = self.get_incorrect_questions
-        incorrect_ids.append(question.id)
-        self.incorrect_questions = ",".join(map(str, incorrect_ids)) + ","
-        if self.complete:
-            self.add_to_score(-1)
-        self.save()
+        answers = self.answers.filter(question=question)
+        if answers.filter(is_correct=True).update(is_correct=False, graded_at=now()):
+            if self.complete:
+                self.add_to_score(-1)
+        else:
+            # An unanswered question never counted towards the score.
+            answers.filter(is_correct=None).update(is_correct=False, graded_at=now())
 
     @property
     def get_incorrect_questions(self):
-        return [int(q) for q in self.incorrect_questions.split(",") if q]
+        return list(
+            self.answers.filter(is_correct=False)
+            .order_by("position")
+            .values_list("question_id", flat=True)
+        )
 
     def remove_incorrect_question(self, question):
-        incorrect_ids = self.get_incorrect_questions
-        if question.id in incorrect_ids:
-            incorrect_ids.remove(question.id)
-            self.incorrect_questions = ",".join(map(str, incorrect_ids)) + ","
+        if self.answers.filter(question=question, is_correct=False).update(
+            is_correct=True, graded_at=now()
+        ):
             self.add_to_score(1)
-            self.save()
 
-    @property
-    def check_if_passed(self):
-        return self.get_percent_correct >= self.quiz.pass_mark
+    def record_answer(self, question, guess, is_correct):
+        """
+        Store the answer to the current question, update the score and
+        advance to the next question with one UPDATE per table.
+        """
+        position = getattr(question, "position", self.current_position)
+        self.current_position = position + 1
+        changes = {"current_position": self.current_position}
+        if is_correct:
+            self.current_score += 1
+            changes["current_score"] = F("current_score") + 1
+
+        with transaction.atomic(savepoint=False):
+            self.answers.filter(question=question).update(
+                answer=guess, is_correct=bool(is_correct)
+            )
+            Sitting.objects.filter(pk=self.pk).update(**changes)
+
+    def record_answers(self, results):
+        """
+        Store every remaining answer and complete the sitting in one
+        transaction. ``results`` is a list of ``(question, guess, is_correct)``.
+        """
+        self.complete = True
+        self.end = now()
+        score = self._save_answers(
+            {
+                question.position: (guess, is_correct)
+                for question, guess, is_correct in results
+            },
+            current_position=self.question_count,
+            complete=True,
+            end=self.end,
+        )
+        self.current_position = self.question_count
+        self.current_score += score
+        return score
+
+    def _save_answers(self, answers_by_position, **changes):
+        """
+        Write ``{position: (guess, is_correct)}`` to the answer rows with one
+        bulk UPDATE, add their score to the sitting together with ``changes``
+        and return that score.
+        """
+        answers = list(
+            self.answers.filter(position__in=answers_by_position).only("id", "position")
+        )
+        for answer in answers:
+            guess, is_correct = answers_by_position[answer.position]
+            answer.answer = guess
+            answer.is_correct = bool(is_correct)
+        score = sum(1 for answer in answers if answer.is_correct)
+
+        with transaction.atomic():
+            SittingAnswer.objects.bulk_update(answers, ["answer", "is_correct"])
+            Sitting.objects.filter(pk=self.pk).update(
+                current_score=F("current_score") + score, **changes
+            )
+        return score
 
     @property
-    def result_message(self):
-        if self.check_if_passed:
-            return _("You have passed this quiz, congratulations!")
-        else:
-            return _("You failed this quiz, try again.")
+    def pending_answers_key(self):
+        return f"quiz:sitting:{self.pk}:pending"
+
+    def get_pending_answers(self, store):
+        """
+        Return the answers buffered in ``store``, the student's session, as
+        ``{position: (guess, is_correct)}``.
+        """
+        pending = store.get(self.pending_answers_key, {})
+        return {int(position): tuple(answer) for position, answer in pending.items()}
+
+    def load_pending_answers(self, store):
+        """
+        Apply the answers buffered in ``store`` to the in-memory position and
+        score, so the attempt continues where the student left off.
+        """
+        pending = self.get_pending_answers(store)
+        if pending:
+            self.current_position = max(pending) + 1
+            self.current_score += sum(
+                1 for guess, correct in pending.values() if correct
+            )
+        return pending
+
+    def buffer_answer(self, store, question, guess, is_correct):
+        """
+        Record an answer in ``store`` instead of the sitting's rows. Returns
+        the number of answers waiting to be flushed.
+        """
+        pending = store.get(self.pending_answers_key, {})
+        position = getattr(question, "position", self.current_position)
+        pending[str(position)] = [guess, bool(is_correct)]
+        store[self.pending_answers_key] = pending
+        self.current_position = position + 1
+        if is_correct:
+            self.current_score += 1
+        return len(pending)
+
+    def flush_pending_answers(self, store, complete=False):
+        """
+        Write the answers buffered in ``store`` to the database in one
+        transaction, completing the sitting if ``complete``. Returns the score
+        and number of the flushed answers.
+        """
+        pending = self.get_pending_answers(store)
+        changes = {"current_position": self.current_position}
+        if complete:
+            self.complete = True
+            self.end = now()
+            changes.update(complete=True, end=self.end)
+        score = self._save_answers(pending, **changes)
+        store.pop(self.pending_answers_key, None)
+        return score, len(pending)
 
     def add_user_answer(self, question, guess):
-        user_answers = json.loads(self.user_answers)
-        user_answers[str(question.id)] = guess
-        self.user_answers = json.dumps(user_answers)
-        self.save()
+        self.answers.filter(question=question).update(answer=guess)
+
+    def regrade(self, answer_key=None):
+        """
+        Re-mark the answered multiple choice questions against the quiz's
+        current answer key. Returns the number of answers that changed.
+        """
+        if answer_key is None:
+            answer_key = self.quiz.get_answer_key()
+        changed, deltas = regrade_answers(
+            self.answers.filter(question_id__in=answer_key, is_correct__isnull=False),
+            answer_key,
+        )
+        if changed:
+            with transaction.atomic():
+                save_regraded_answers(changed, deltas)
+            self.current_score += deltas[self.pk]
+        return len(changed)
 
     def get_questions(self, with_answers=False):
-        question_ids = self._question_ids()
-        questions = sorted(
-            self.quiz.question_set.filter(id__in=question_ids).select_subclasses(),
-            key=lambda q: question_ids.index(q.id),
-        )
+        """
+        Return the sitting's questions in order. With ``with_answers`` each
+        question also carries ``user_answer`` and ``is_correct``, matched by
+        position from a single query.
+        """
+        questions = self.get_cached_questions()
         if with_answers:
-            user_answers = json.loads(self.user_answers)
+            answers = {
+                position: (answer, is_correct)
+                for position, answer, is_correct in self.answers.values_list(
+                    "position", "answer", "is_correct"
+                )
+            }
             for question in questions:
-                question.user_answer = user_answers.get(str(question.id))
+                answer, is_correct = answers.get(question.position, ("", None))
+                question.user_answer = answer
+                question.is_correct = is_correct
         return questions
 
+    def apply_marking(self, decisions):
+        """
+        Apply a set of ``{question_id: is_correct}`` marking decisions and
+        recompute the score in one transaction.
+        """
+        correct_ids = [id for id, is_correct in decisions.items() if is_correct]
+        incorrect_ids = [id for id, is_correct in decisions.items() if not is_correct]
+        correct_count = (
+            SittingAnswer.objects.filter(sitting=OuterRef("pk"), is_correct=True)
+            .values("sitting")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        with transaction.atomic():
+            self.answers.filter(question_id__in=correct_ids).update(
+                is_correct=True, graded_at=now()
+            )
+            self.answers.filter(question_id__in=incorrect_ids).update(
+                is_correct=False, graded_at=now()
+            )
+            Sitting.objects.filter(pk=self.pk).update(
+                current_score=Coalesce(Subquery(correct_count), 0)
+            )
+        self.refresh_from_db(fields=["current_score"])
+
     @property
     def questions_with_user_answers(self):
         return {q: q.user_answer for q in self.get_questions(with_answers=True)}
 
-    @property
-    def get_max_score(self):
-        return len(self._question_ids())
-
     def progress(self):
-        answered = len(json.loads(self.user_answers))
-        total = self.get_max_score
-        return answered, total
+        return self.current_position, self.question_count
+
+
+class SittingAnswerManager(models.Manager):
+    def essay_queue(self, quiz, after=0, limit=50):
+        """
+        Return up to ``limit`` answered, ungraded essay answers of ``quiz``'s
+        completed sittings with a primary key above ``after``. The essay
+        questions are loaded once and shared by every answer.
+        """
+        questions = {
+            question.pk: question
+            for question in EssayQuestion.objects.filter(quiz=quiz)
+        }
+        answers = list(
+            self.filter(
+                question_id__in=questions,
+                sitting__quiz=quiz,
+                sitting__complete=True,
+                is_correct__isnull=False,
+                graded_at__isnull=True,
+                pk__gt=after,
+            )
+            .select_related("sitting__user")
+            .order_by("pk")[:limit]
+        )
+        for answer in answers:
+            answer.question = questions[answer.question_id]
+        return answers
+
+    def grade_essays(self, quiz, decisions):
+        """
+        Apply ``{answer_id: is_correct}`` decisions to essay answers of
+        ``quiz``, stamp them as graded and shift the sitting scores, with
+        one UPDATE per decision and per distinct score change. Returns the
+        number of answers graded.
+        """
+        answers = list(
+            self.filter(
+                pk__in=decisions,
+                question__in=EssayQuestion.objects.filter(quiz=quiz),
+                sitting__quiz=quiz,
+                sitting__complete=True,
+            ).only("id", "sitting_id", "is_correct")
+        )
+        deltas = {}
+        for answer in answers:
+            delta = int(decisions[answer.pk]) - int(bool(answer.is_correct))
+            deltas[answer.sitting_id] = deltas.get(answer.sitting_id, 0) + delta
+
+        graded_at = now()
+        with transaction.atomic():
+            for is_correct in (True, False):
+                answer_ids = [a.pk for a in answers if decisions[a.pk] == is_correct]
+                if answer_ids:
+                    self.filter(pk__in=answer_ids).update(
+                        is_correct=is_correct, graded_at=graded_at
+                    )
+            shift_sitting_scores(deltas)
+        return len(answers)
+
+
+class SittingAnswer(models.Model):
+    sitting = models.ForeignKey(
+        Sitting,
+        related_name="answers",
+        verbose_name=_("Sitting"),
+        on_delete=models.CASCADE,
+    )
+    position = models.PositiveIntegerField(verbose_name=_("Position"))
+    question = models.ForeignKey(
+        "Question",
+        related_name="sitting_answers",
+        verbose_name=_("Question"),
+        on_delete=models.CASCADE,
+    )
+    answer = models.TextField(blank=True, verbose_name=_("User Answer"))
+    is_correct = models.BooleanField(
+        null=True,
+        verbose_name=_("Correct"),
+        help_text=_("Empty until the question has been answered."),
+    )
+    graded_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Graded"),
+        help_text=_("When a lecturer last marked this answer."),
+    )
+
+    objects = SittingAnswerManager()
+
+    class Meta:
+        verbose_name = _("Sitting Answer")
+        verbose_name_plural = _("Sitting Answers")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["sitting", "position"], name="unique_sitting_position"
+            ),
+            models.UniqueConstraint(
+                fields=["sitting", "question"], name="unique_sitting_question"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["sitting", "is_correct"], name="quiz_answer_correct_idx"
+            ),
+            models.Index(
+                fields=["question", "id"],
+                condition=Q(graded_at__isnull=True),
+                name="quiz_answer_ungraded_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sitting_id}: {self.position}"
+
+
+class SittingArchiveManager(models.Manager):
+    def archive(self, before, batch_size=500):
+        """
+        Move the sittings completed before ``before`` into the archive,
+        ``batch_size`` at a time. Each batch copies the sittings with their
+        packed answers and deletes the originals in one transaction; yields
+        the number archived by each batch.
+        """
+        while True:
+            with transaction.atomic():
+                sittings = list(
+                    Sitting.objects.filter(complete=True, end__lt=before)
+                    .order_by("pk")
+                    .select_for_update()[:batch_size]
+                )
+                if not sittings:
+                    return
+                answers = {}
+                for sitting_id, *answer in (
+                    SittingAnswer.objects.filter(sitting__in=sittings)
+                    .order_by("sitting_id", "position")
+                    .values_list(
+                        "sitting_id", "position", "question_id", "answer", "is_correct"
+                    )
+                ):
+                    answers.setdefault(sitting_id, []).append(answer)
+                self.bulk_create(
+                    SittingArchive(
+                        sitting_id=sitting.pk,
+                        user_id=sitting.user_id,
+                        quiz_id=sitting.quiz_id,
+                        course_id=sitting.course_id,
+                        question_count=sitting.question_count,
+                        current_score=sitting.current_score,
+                        seed=sitting.seed,
+                        start=sitting.start,
+                        end=sitting.end,
+                        answers=pack_answers(answers.get(sitting.pk, [])),
+                    )
+                    for sitting in sittings
+                )
+                Sitting.objects.filter(pk__in=[s.pk for s in sittings]).delete()
+            yield len(sittings)
+
+
+class SittingArchive(SittingResultMixin, models.Model):
+    """
+    A completed sitting moved out of the live tables. Only the score summary
+    is kept in columns; the answers are packed into a single compressed
+    blob and can be read back with ``get_answers``.
+    """
+
+    sitting_id = models.PositiveBigIntegerField(unique=True, verbose_name=_("Sitting"))
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, verbose_name=_("User"), on_delete=models.CASCADE
+    )
+    quiz = models.ForeignKey(Quiz, verbose_name=_("Quiz"), on_delete=models.CASCADE)
+    course = models.ForeignKey(
+        Course, verbose_name=_("Course"), on_delete=models.CASCADE
+    )
+    question_count = models.PositiveIntegerField(verbose_name=_("Question Count"))
+    current_score = models.IntegerField(verbose_name=_("Score"))
+    seed = models.PositiveIntegerField(verbose_name=_("Seed"))
+    start = models.DateTimeField(verbose_name=_("Start"))
+    end = models.DateTimeField(verbose_name=_("End"))
+    answers = models.BinaryField(verbose_name=_("Answers"))
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Archived"))
+
+    objects = SittingArchiveManager()
+
+    class Meta:
+        verbose_name = _("Archived Sitting")
+        verbose_name_plural = _("Archived Sittings")
+        indexes = [
+            models.Index(fields=["user", "-end"], name="quiz_archive_user_end_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.quiz} ({self.end:%Y-%m-%d})"
+
+    def get_answers(self):
+        """Return the ``(position, question_id, answer, is_correct)`` rows."""
+        return [tuple(answer) for answer in unpack_answers(self.answers)]
+
+    def get_questions(self):
+        """
+        Return the archived questions in order, each carrying ``user_answer``
+        and ``is_correct``. Questions deleted since are left out.
+        """
+        answers = self.get_answers()
+        questions_by_id = {
+            question.id: question
+            for question in Question.objects.filter(
+                id__in=[question_id for _p, question_id, _a, _c in answers]
+            ).select_subclasses()
+        }
+        questions = []
+        for position, question_id, answer, is_correct in answers:
+            question = questions_by_id.get(question_id)
+            if question is None:
+                continue
+            question.position = position
+            question.user_answer = answer
+            question.is_correct = is_correct
+            questions.append(question)
+        prefetch_choices(questions, seed=self.seed)
+        return questions
 
 
 class Question(models.Model):
@@ -414,32 +1256,55 @@ class MCQuestion(Question):
         verbose_name = _("Multiple Choice Question")
         verbose_name_plural = _("Multiple Choice Questions")
 
-    def check_if_correct(self, guess):
-        try:
-            answer = Choice.objects.get(id=int(guess))
-            return answer.correct
-        except (Choice.DoesNotExist, ValueError):
-            return False
+    def check_if_correct(self, guess, answer_key=None):
+        if answer_key is not None and self.id in answer_key:
+            return answer_matches_key(answer_key, self.id, guess)
+        answer = self.get_choice(guess)
+        return answer.correct if answer else False
 
-    def order_choices(self, queryset):
+    def order_choices(self, queryset, seed=None):
         if self.choice_order == "content":
             return queryset.order_by("choice_text")
         elif self.choice_order == "random":
-            return queryset.order_by("?")
+            return self.order_choice_list(queryset.order_by("id"), seed=seed)
         else:
             return queryset
 
+    def order_choice_list(self, choices, seed=None):
+        """
+        Order already fetched choices. Random ordering is shuffled in Python;
+        given a sitting's seed it is the same on every reload of the attempt.
+        """
+        if self.choice_order == "content":
+            return sorted(choices, key=lambda choice: choice.choice_text)
+        elif self.choice_order == "random":
+            choices = list(choices)
+            rng = random.Random(None if seed is None else f"{seed}:{self.id}")
+            rng.shuffle(choices)
+            return choices
+        else:
+            return list(choices)
+
     def get_choices(self):
+        if hasattr(self, "_cached_choices"):
+            return self._cached_choices
         return self.order_choices(Choice.objects.filter(question=self))
 
     def get_choices_list(self):
         return [(choice.id, choice.choice_text) for choice in self.get_choices()]
 
-    def answer_choice_to_string(self, guess):
+    def get_choice(self, guess):
         try:
-            return Choice.objects.get(id=int(guess)).choice_text
-        except (Choice.DoesNotExist, ValueError):
-            return ""
+            choice_id = int(guess)
+        except (TypeError, ValueError):
+            return None
+        if hasattr(self, "_cached_choices"):
+            return next((c for c in self._cached_choices if c.id == choice_id), None)
+        return Choice.objects.filter(question=self, id=choice_id).first()
+
+    def answer_choice_to_string(self, guess):
+        answer = self.get_choice(guess)
+        return answer.choice_text if answer else ""
 
 
 class Choice(models.Model):
@@ -470,7 +1335,7 @@ class EssayQuestion(Question):
         verbose_name = _("Essay Style Question")
         verbose_name_plural = _("Essay Style Questions")
 
-    def check_if_correct(self, guess):
+    def check_if_correct(self, guess, answer_key=None):
         return False  # Needs manual grading
 
     def get_answers(self):
@@ -481,3 +1346,141 @@ class EssayQuestion(Question):
 
     def answer_choice_to_string(self, guess):
         return str(guess)
+
+
+def answer_matches_key(answer_key, question_id, guess):
+    try:
+        return int(guess) in answer_key.get(question_id, ())
+    except (TypeError, ValueError):
+        return False
+
+
+def regrade_answers(answers, answer_key):
+    """
+    Re-mark ``answers`` against ``answer_key``. Returns the answers whose
+    mark changed and the resulting score change per sitting id.
+    """
+    changed = []
+    deltas = {}
+    for answer in answers:
+        is_correct = answer_matches_key(answer_key, answer.question_id, answer.answer)
+        if is_correct != answer.is_correct:
+            answer.is_correct = is_correct
+            changed.append(answer)
+            deltas[answer.sitting_id] = deltas.get(answer.sitting_id, 0) + (
+                1 if is_correct else -1
+            )
+    return changed, deltas
+
+
+def save_regraded_answers(changed, deltas):
+    """
+    Write re-marked answers with one bulk UPDATE and shift the sitting
+    scores with one UPDATE per distinct score change.
+    """
+    SittingAnswer.objects.bulk_update(changed, ["is_correct"], batch_size=500)
+    shift_sitting_scores(deltas)
+
+
+def shift_sitting_scores(deltas):
+    """Apply ``{sitting_id: delta}`` with one UPDATE per distinct delta."""
+    sittings_by_delta = {}
+    for sitting_id, delta in deltas.items():
+        if delta:
+            sittings_by_delta.setdefault(delta, []).append(sitting_id)
+    for delta, sitting_ids in sittings_by_delta.items():
+        Sitting.objects.filter(pk__in=sitting_ids).update(
+            current_score=F("current_score") + delta
+        )
+
+
+def _subquery_aggregate(queryset, aggregate):
+    """Aggregate ``queryset`` per quiz as a correlated subquery, 0 when empty."""
+    values = (
+        queryset.order_by().values("quiz").annotate(value=aggregate).values("value")
+    )
+    return Coalesce(Subquery(values), 0)
+
+
+def pack_answers(answers):
+    return zlib.compress(json.dumps(answers, separators=(",", ":")).encode())
+
+
+def unpack_answers(data):
+    return json.loads(zlib.decompress(data))
+
+
+def prefetch_choices(questions, seed=None):
+    """
+    Attach the ordered choices of every multiple choice question in
+    ``questions`` using a single query.
+    """
+    mc_questions = [q for q in questions if isinstance(q, MCQuestion)]
+    choices = {question.id: [] for question in mc_questions}
+    for choice in Choice.objects.filter(question__in=mc_questions).order_by("id"):
+        choices[choice.question_id].append(choice)
+    for question in mc_questions:
+        question._cached_choices = question.order_choice_list(
+            choices[question.id], seed=seed
+        )
+
+
+def _question_quiz_ids(question_id):
+    return list(
+        Question.quiz.through.objects.filter(question_id=question_id).values_list(
+            "quiz_id", flat=True
+        )
+    )
+
+
+def _invalidate_quizzes(quiz_ids):
+    if quiz_ids:
+        transaction.on_commit(lambda: Quiz.objects.bump_cache_versions(quiz_ids))
+
+
+def _invalidate_question_quizzes(question_id):
+    quiz_ids = _question_quiz_ids(question_id)
+    _invalidate_quizzes(quiz_ids)
+    return quiz_ids
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=MCQuestion)
+@receiver(post_save, sender=EssayQuestion)
+def question_post_save_receiver(sender, instance, **kwargs):
+    _invalidate_question_quizzes(instance.pk)
+
+
+@receiver(pre_delete, sender=Question)
+def question_pre_delete_receiver(sender, instance, **kwargs):
+    # The link rows are gone by post_delete, so remember the quizzes here.
+    instance._quiz_ids = _invalidate_question_quizzes(instance.pk)
+
+
+@receiver(post_delete, sender=Question)
+def question_post_delete_receiver(sender, instance, **kwargs):
+    quiz_ids = getattr(instance, "_quiz_ids", None)
+    if quiz_ids:
+        Quiz.objects.update_question_counts(quiz_ids)
+
+
+@receiver(m2m_changed, sender=Question.quiz.through)
+def question_quizzes_changed_receiver(sender, instance, action, reverse, **kwargs):
+    if action == "pre_clear" and not reverse:
+        instance._cleared_quiz_ids = _question_quiz_ids(instance.pk)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        if reverse:
+            quiz_ids = [instance.pk]
+        elif action == "post_clear":
+            quiz_ids = getattr(instance, "_cleared_quiz_ids", [])
+        else:
+            quiz_ids = list(kwargs["pk_set"] or [])
+        if quiz_ids:
+            Quiz.objects.update_question_counts(quiz_ids)
+        _invalidate_quizzes(quiz_ids)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_change_receiver(sender, instance, **kwargs):
+    _invalidate_question_quizzes(instance.question_id)
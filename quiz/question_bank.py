@@ -0,0 +1,295 @@
+"""
+Streaming import and export of a quiz's question bank.
+
+A question bank is a stream of question records::
+
+    {
+        "type": "mc" | "essay",
+        "content": "...",
+        "explanation": "...",
+        "choice_order": "content" | "random" | "none",
+        "choices": [{"text": "...", "correct": true}, ...],
+    }
+
+stored either as JSON Lines (one record per line) or as CSV with one row
+per choice, where consecutive rows sharing a ``question`` reference
+belong to the same question.
+"""
+import csv
+import json
+from itertools import groupby, islice
+
+from django.db import connection, transaction
+
+from .models import (
+    CHOICE_ORDER_OPTIONS,
+    Choice,
+    EssayQuestion,
+    MCQuestion,
+    Question,
+    Quiz,
+)
+
+CSV_FIELDS = [
+    "question",
+    "type",
+    "content",
+    "explanation",
+    "choice_order",
+    "choice",
+    "correct",
+]
+CHOICE_ORDERS = {value for value, label in CHOICE_ORDER_OPTIONS}
+TRUE_VALUES = {"1", "true", "yes", "y"}
+CONTENT_MAX_LENGTH = Question._meta.get_field("content").max_length
+EXPLANATION_MAX_LENGTH = Question._meta.get_field("explanation").max_length
+CHOICE_MAX_LENGTH = Choice._meta.get_field("choice_text").max_length
+
+
+class QuestionImportError(ValueError):
+    pass
+
+
+def read_jsonl(lines):
+    for number, line in enumerate(_decode(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            raise QuestionImportError(f"Line {number}: {error}")
+
+
+def read_csv(lines):
+    rows = csv.DictReader(_decode(lines))
+    try:
+        missing = {"question", "content"} - set(rows.fieldnames or [])
+        if missing:
+            raise QuestionImportError(
+                f"Missing CSV columns: {', '.join(sorted(missing))}"
+            )
+        for _reference, group in groupby(rows, key=lambda row: row["question"]):
+            group = list(group)
+            first = group[0]
+            yield {
+                "type": first.get("type") or "mc",
+                "content": first["content"],
+                "explanation": first.get("explanation") or "",
+                "choice_order": first.get("choice_order") or "",
+                "choices": [
+                    {
+                        "text": row["choice"],
+                        "correct": (row.get("correct") or "").strip().lower()
+                        in TRUE_VALUES,
+                    }
+                    for row in group
+                    if row.get("choice")
+                ],
+            }
+    except csv.Error as error:
+        raise QuestionImportError(f"Line {rows.reader.line_num}: {error}")
+
+
+def _decode(lines):
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                raise QuestionImportError(f"Line {number}: the file is not UTF-8")
+        yield line
+
+
+def clean_record(record, number):
+    if not isinstance(record, dict):
+        raise QuestionImportError(f"Question {number}: expected an object")
+    question_type = record.get("type", "mc")
+    content = str(record.get("content") or "").strip()
+    explanation = str(record.get("explanation") or "")
+    if question_type not in ("mc", "essay"):
+        raise QuestionImportError(f"Question {number}: unknown type {question_type!r}")
+    if not content:
+        raise QuestionImportError(f"Question {number}: content is required")
+    # bulk_create skips field validation, so lengths are checked here.
+    _check_length(content, CONTENT_MAX_LENGTH, f"Question {number}: content")
+    _check_length(
+        explanation, EXPLANATION_MAX_LENGTH, f"Question {number}: explanation"
+    )
+    choice_order = record.get("choice_order") or "none"
+    if choice_order not in CHOICE_ORDERS:
+        raise QuestionImportError(
+            f"Question {number}: unknown choice order {choice_order!r}"
+        )
+    choices = record.get("choices") or []
+    if not isinstance(choices, list) or not all(
+        isinstance(choice, dict) for choice in choices
+    ):
+        raise QuestionImportError(
+            f"Question {number}: choices must be a list of objects"
+        )
+    choices = [
+        (str(choice.get("text", "")), bool(choice.get("correct"))) for choice in choices
+    ]
+    for text, correct in choices:
+        _check_length(text, CHOICE_MAX_LENGTH, f"Question {number}: choice text")
+    if question_type == "mc" and not any(correct for text, correct in choices):
+        raise QuestionImportError(f"Question {number}: no correct choice")
+    return {
+        "type": question_type,
+        "content": content,
+        "explanation": explanation,
+        "choice_order": choice_order,
+        "choices": choices,
+    }
+
+
+def _check_length(value, max_length, label):
+    if len(value) > max_length:
+        raise QuestionImportError(f"{label} is longer than {max_length} characters")
+
+
+def import_questions(quiz, records, batch_size=500):
+    """
+    Create the questions described by ``records`` and link them to ``quiz``.
+    Rows are inserted ``batch_size`` questions at a time with bulk inserts,
+    all in one transaction. Returns the number of questions created.
+    """
+    records = (
+        clean_record(record, number) for number, record in enumerate(records, start=1)
+    )
+    created = 0
+    with transaction.atomic():
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            _insert_batch(quiz, batch)
+            created += len(batch)
+        if created:
+            Quiz.objects.update_question_counts([quiz.pk])
+            transaction.on_commit(lambda: Quiz.objects.bump_cache_versions([quiz.pk]))
+    return created
+
+
+def _insert_batch(quiz, batch):
+    questions = Question.objects.bulk_create(
+        Question(content=record["content"], explanation=record["explanation"])
+        for record in batch
+    )
+    # bulk_create cannot insert multi-table children, so the subclass rows
+    # are added to their own tables for the parent rows created above.
+    _insert_rows(
+        MCQuestion,
+        ["question_ptr_id", "choice_order"],
+        [
+            (question.pk, record["choice_order"])
+            for question, record in zip(questions, batch)
+            if record["type"] == "mc"
+        ],
+    )
+    _insert_rows(
+        EssayQuestion,
+        ["question_ptr_id"],
+        [
+            (question.pk,)
+            for question, record in zip(questions, batch)
+            if record["type"] == "essay"
+        ],
+    )
+    Question.quiz.through.objects.bulk_create(
+        Question.quiz.through(question_id=question.pk, quiz_id=quiz.pk)
+        for question in questions
+    )
+    Choice.objects.bulk_create(
+        Choice(question_id=question.pk, choice_text=text, correct=correct)
+        for question, record in zip(questions, batch)
+        if record["type"] == "mc"
+        for text, correct in record["choices"]
+    )
+
+
+def _insert_rows(model, columns, rows):
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def export_questions(quiz, batch_size=500):
+    """
+    Yield the question records of ``quiz``, reading the questions and their
+    choices ``batch_size`` questions at a time.
+    """
+    last_pk = 0
+    while True:
+        questions = list(
+            Question.objects.filter(quiz=quiz, pk__gt=last_pk)
+            .order_by("pk")
+            .select_subclasses()[:batch_size]
+        )
+        if not questions:
+            return
+        choices = {}
+        for choice in Choice.objects.filter(
+            question_id__in=[question.pk for question in questions]
+        ).order_by("pk"):
+            choices.setdefault(choice.question_id, []).append(
+                {"text": choice.choice_text, "correct": choice.correct}
+            )
+        for question in questions:
+            if isinstance(question, MCQuestion):
+                yield {
+                    "type": "mc",
+                    "content": question.content,
+                    "explanation": question.explanation,
+                    "choice_order": question.choice_order or "none",
+                    "choices": choices.get(question.pk, []),
+                }
+            elif isinstance(question, EssayQuestion):
+                yield {
+                    "type": "essay",
+                    "content": question.content,
+                    "explanation": question.explanation,
+                    "choice_order": "none",
+                    "choices": [],
+                }
+        last_pk = questions[-1].pk
+
+
+def write_jsonl(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def write_csv(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for number, record in enumerate(records, start=1):
+        question = [
+            number,
+            record["type"],
+            record["content"],
+            record["explanation"],
+            record["choice_order"],
+        ]
+        if not record["choices"]:
+            yield writer.writerow(question + ["", ""])
+        for choice in record["choices"]:
+            yield writer.writerow(
+                question + [choice["text"], "1" if choice["correct"] else "0"]
+            )
+
+
+READERS = {"csv": read_csv, "json": read_jsonl}
+WRITERS = {"csv": write_csv, "json": write_jsonl}
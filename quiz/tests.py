@@ -1,3 +1,1224 @@
-from django.test import TestCase
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from threading import Barrier
+from unittest import skipIf
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from core.models import Session
+from course.models import Course, Program
+from .item_analysis import get_item_analysis, item_statistics
+from .models import (
+    Choice,
+    EssayQuestion,
+    MCQuestion,
+    Progress,
+    ProgressScore,
+    Quiz,
+    Sitting,
+    SittingAnswer,
+    SittingArchive,
+    annotate_result,
+)
+from .question_bank import (
+    READERS,
+    WRITERS,
+    QuestionImportError,
+    export_questions,
+    import_questions,
+)
+from .utils import DEADLINE_GRACE, PRACTICE_DEADLINE_GRACE
+
+User = get_user_model()
+
+# Render pages without the collected static manifest or a language prefix.
+page_settings = override_settings(
+    LANGUAGE_CODE="en",
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+)
+
+
+class QuizTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user",
+            email="user@example.com",
+            password="password",
+            is_student=True,
+        )
+        program = Program.objects.create(title="Computer Science")
+        self.course = Course.objects.create(
+            title="Algorithms", code="CS101", program=program, semester="First"
+        )
+        self.quiz = Quiz.objects.create(
+            course=self.course, title="Sorting", category="exam", exam_paper=True
+        )
+        self.questions = []
+        for number in range(3):
+            question = MCQuestion.objects.create(
+                content=f"Question {number}", choice_order="none"
+            )
+            question.quiz.add(self.quiz)
+            Choice.objects.create(question=question, choice_text="Right", correct=True)
+            Choice.objects.create(question=question, choice_text="Wrong")
+            self.questions.append(question)
+
+    def correct_choice(self, question):
+        return question.choice_set.get(correct=True)
+
+    def wrong_choice(self, question):
+        return question.choice_set.get(correct=False)
+
+
+class SittingRecordAnswerTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+
+    def test_record_answer_is_one_update_per_table(self):
+        question = self.sitting.get_first_question()
+        guess = str(self.correct_choice(question).id)
+
+        with self.assertNumQueries(2):
+            self.sitting.record_answer(question, guess, True)
+
+    def test_record_answer_updates_score_answers_and_pointer(self):
+        first = self.sitting.get_first_question()
+        self.sitting.record_answer(first, str(self.correct_choice(first).id), True)
+        second = self.sitting.get_first_question()
+        self.sitting.record_answer(second, str(self.wrong_choice(second).id), False)
+
+        self.sitting.refresh_from_db()
+        self.assertEqual(self.sitting.current_score, 1)
+        self.assertEqual(self.sitting.get_incorrect_questions, [second.id])
+        self.assertEqual(self.sitting.progress(), (2, 3))
+        self.assertEqual(self.sitting.get_first_question().id, self.questions[2].id)
+
+
+@skipIf(connection.is_in_memory_db(), "needs a file-backed test database")
+class SittingConcurrencyTests(QuizTestMixin, TransactionTestCase):
+    threads = 12
+
+    def setUp(self):
+        super().setUp()
+        for number in range(3, self.threads):
+            question = MCQuestion.objects.create(
+                content=f"Question {number}", choice_order="none"
+            )
+            question.quiz.add(self.quiz)
+            Choice.objects.create(question=question, choice_text="Right", correct=True)
+            self.questions.append(question)
+
+    def run_in_threads(self, target):
+        def wrapper(index):
+            try:
+                return target(index)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            return list(executor.map(wrapper, range(self.threads)))
+
+    def test_concurrent_requests_share_one_open_sitting(self):
+        def take(index):
+            sitting = Sitting.objects.user_sitting(self.user, self.quiz, self.course)
+            question = sitting.get_questions()[index]
+            guess = question.get_choices()[0].id
+            sitting.record_answer(question, str(guess), True)
+            ProgressScore.objects.add_score(self.user, self.quiz, 1, 1)
+            return sitting.pk
+
+        sitting_ids = self.run_in_threads(take)
+
+        self.assertEqual(len(set(sitting_ids)), 1)
+        sitting = Sitting.objects.get(complete=False)
+        self.assertEqual(sitting.current_score, self.threads)
+        self.assertEqual(sitting.answers.filter(is_correct=True).count(), self.threads)
+        score = ProgressScore.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((score.score, score.possible), (self.threads, self.threads))
+
+    def test_completing_does_not_lose_concurrent_answers(self):
+        sitting_id = Sitting.objects.new_sitting(self.user, self.quiz, self.course).pk
+        loaded = Barrier(self.threads)
+
+        def take(index):
+            sitting = Sitting.objects.get(pk=sitting_id)
+            question = sitting.get_questions()[index]
+            loaded.wait()
+            if index == 0:
+                sitting.mark_quiz_complete()
+            else:
+                guess = question.get_choices()[0].id
+                sitting.record_answer(question, str(guess), True)
+
+        self.run_in_threads(take)
+
+        sitting = Sitting.objects.get(pk=sitting_id)
+        self.assertTrue(sitting.complete)
+        self.assertEqual(sitting.current_score, self.threads - 1)
+
+
+class SittingQuestionCacheTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+
+    def test_questions_and_choices_are_served_from_cache(self):
+        with self.assertNumQueries(0):
+            question = self.sitting.get_first_question()
+            choices = question.get_choices_list()
+            self.assertTrue(question.check_if_correct(choices[0][0]))
+            self.assertEqual(question.answer_choice_to_string(choices[1][0]), "Wrong")
+
+    def test_choice_change_invalidates_cache(self):
+        question = self.sitting.get_first_question()
+        choice = self.wrong_choice(question)
+        with self.captureOnCommitCallbacks(execute=True):
+            choice.choice_text = "Changed"
+            choice.save()
+
+        # The next request loads the quiz, and its bumped version, afresh.
+        sitting = Sitting.objects.select_related("quiz").get(pk=self.sitting.pk)
+        question = sitting.get_first_question()
+        self.assertEqual(question.answer_choice_to_string(choice.id), "Changed")
+
+
+class SittingOrderTests(QuizTestMixin, TestCase):
+    def test_random_order_is_stable_across_cache_reloads(self):
+        self.quiz.random_order = True
+        self.quiz.save()
+        MCQuestion.objects.filter(quiz=self.quiz).update(choice_order="random")
+        for question in self.questions:
+            for number in range(4):
+                Choice.objects.create(question=question, choice_text=f"Extra {number}")
+
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        first = [
+            (question.id, [c.id for c in question.get_choices()])
+            for question in sitting.get_questions()
+        ]
+        cache.clear()
+        second = [
+            (question.id, [c.id for c in question.get_choices()])
+            for question in sitting.get_questions()
+        ]
+
+        self.assertEqual(first, second)
+
+    def test_draws_questions_from_pool(self):
+        self.quiz.questions_per_attempt = 2
+        self.quiz.save()
+
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+
+        question_ids = [question.id for question in sitting.get_questions()]
+        self.assertEqual(sitting.get_max_score, 2)
+        self.assertEqual(len(set(question_ids)), 2)
+        self.assertEqual(question_ids, sorted(question_ids))
+        self.assertTrue(set(question_ids) <= {q.id for q in self.questions})
+
+
+class AnswerKeyTests(QuizTestMixin, TestCase):
+    def test_answer_key_is_built_once_and_cached(self):
+        with self.assertNumQueries(1):
+            answer_key = self.quiz.get_answer_key()
+        with self.assertNumQueries(0):
+            self.quiz.get_answer_key()
+
+        question = self.questions[0]
+        correct_id = self.correct_choice(question).id
+        self.assertEqual(answer_key[question.id], {correct_id})
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                question.check_if_correct(correct_id, answer_key=answer_key)
+            )
+            self.assertFalse(question.check_if_correct("x", answer_key=answer_key))
+
+    def test_choice_fix_is_seen_through_the_quiz_row(self):
+        question = self.questions[0]
+        wrong = self.wrong_choice(question)
+        self.quiz.get_answer_key()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wrong.correct = True
+            wrong.save()
+
+        # A worker holding the old entry still moves to the new version,
+        # because the version is read from the database with the quiz.
+        quiz = Quiz.objects.get(pk=self.quiz.pk)
+        self.assertEqual(quiz.cache_version, self.quiz.cache_version + 1)
+        self.assertIn(wrong.id, quiz.get_answer_key()[question.id])
+
+        self.quiz.title = "Renamed"
+        self.quiz.save()
+        quiz.refresh_from_db()
+        self.assertEqual(quiz.cache_version, self.quiz.cache_version + 1)
+
+    def test_regrade_after_answer_key_fix(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        question = sitting.get_first_question()
+        wrong = self.wrong_choice(question)
+        sitting.record_answer(question, str(wrong.id), False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.filter(question=question).update(correct=False)
+            wrong.correct = True
+            wrong.save()
+
+        self.assertEqual(sitting.regrade(), 1)
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 1)
+        self.assertEqual(sitting.get_incorrect_questions, [])
+
+
+class RegradeQuizTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sittings = []
+        for number in range(3):
+            user = User.objects.create_user(username=f"student{number}")
+            sitting = Sitting.objects.new_sitting(user, self.quiz, self.course)
+            sitting.record_answers(
+                [
+                    (question, str(self.wrong_choice(question).id), False)
+                    for question in sitting.get_questions()
+                ]
+            )
+            self.sittings.append(sitting)
+        question = self.questions[0]
+        wrong = self.wrong_choice(question)
+        with self.captureOnCommitCallbacks(execute=True):
+            Choice.objects.filter(question=question).update(correct=False)
+            wrong.correct = True
+            wrong.save()
+
+    def scores(self):
+        return list(
+            Sitting.objects.order_by("pk").values_list("current_score", flat=True)
+        )
+
+    def test_command_regrades_in_batches(self):
+        out = StringIO()
+        call_command("regrade_quiz", self.quiz.pk, "--batch-size=2", stdout=out)
+
+        self.assertEqual(self.scores(), [1, 1, 1])
+        self.assertIn("2 sittings re-graded, 2 answers changed", out.getvalue())
+        self.assertIn("Re-graded 3 sittings", out.getvalue())
+
+    def test_command_resumes_after_sitting(self):
+        call_command(
+            "regrade_quiz",
+            self.quiz.pk,
+            f"--start-after={self.sittings[0].pk}",
+            stdout=StringIO(),
+        )
+        self.assertEqual(self.scores(), [0, 1, 1])
+
+        call_command("regrade_quiz", self.quiz.pk, stdout=StringIO())
+        self.assertEqual(self.scores(), [1, 1, 1])
+
+    def test_unknown_quiz(self):
+        with self.assertRaises(CommandError):
+            call_command("regrade_quiz", 999, stdout=StringIO())
+
+
+class QuizQuestionCountTests(QuizTestMixin, TestCase):
+    def question_count(self):
+        self.quiz.refresh_from_db()
+        return self.quiz.question_count
+
+    def test_count_follows_question_links(self):
+        first, second, third = self.questions
+        self.assertEqual(self.question_count(), 3)
+
+        first.quiz.remove(self.quiz)
+        self.assertEqual(self.question_count(), 2)
+        second.quiz.clear()
+        self.assertEqual(self.question_count(), 1)
+        self.quiz.question_set.add(first, second)
+        self.assertEqual(self.question_count(), 3)
+        third.delete()
+        self.assertEqual(self.question_count(), 2)
+        self.quiz.question_set.clear()
+        self.assertEqual(self.question_count(), 0)
+
+    def test_check_command_repairs_drift(self):
+        Quiz.objects.filter(pk=self.quiz.pk).update(question_count=7)
+
+        out = StringIO()
+        call_command("check_question_counts", stdout=out)
+        self.assertIn("stored 7, actual 3", out.getvalue())
+        self.assertEqual(self.question_count(), 7)
+
+        call_command("check_question_counts", "--repair", stdout=StringIO())
+        self.assertEqual(self.question_count(), 3)
+
+
+class QuestionBankTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        essay = EssayQuestion.objects.create(content="Explain merge sort")
+        essay.quiz.add(self.quiz)
+        self.target = Quiz.objects.create(
+            course=self.course, title="Sorting copy", category="exam"
+        )
+
+    def question_bank(self, quiz):
+        return [
+            (
+                type(question).__name__,
+                question.content,
+                [
+                    (choice.choice_text, choice.correct)
+                    for choice in Choice.objects.filter(
+                        question_id=question.pk
+                    ).order_by("pk")
+                ],
+            )
+            for question in quiz.get_questions().order_by("pk")
+        ]
+
+    def test_round_trip(self):
+        for file_format in ("csv", "json"):
+            with self.subTest(file_format=file_format):
+                target = Quiz.objects.create(
+                    course=self.course, title=f"Copy {file_format}", category="exam"
+                )
+                data = "".join(WRITERS[file_format](export_questions(self.quiz)))
+                lines = data.splitlines(keepends=True)
+
+                with self.assertNumQueries(8):
+                    created = import_questions(target, READERS[file_format](lines))
+
+                target.refresh_from_db()
+                self.assertEqual(created, 4)
+                self.assertEqual(target.question_count, 4)
+                self.assertEqual(
+                    self.question_bank(target), self.question_bank(self.quiz)
+                )
+
+    def test_invalid_question_rolls_back(self):
+        records = [
+            {"content": "Fine", "choices": [{"text": "A", "correct": True}]},
+            {"content": "No answer", "choices": [{"text": "A"}]},
+        ]
+        with self.assertRaisesMessage(QuestionImportError, "Question 2"):
+            import_questions(self.target, records, batch_size=1)
+        self.assertFalse(self.target.question_set.exists())
+
+    def test_malformed_records_are_reported(self):
+        cases = [
+            ({"content": "x", "choices": ["a", "b"]}, "list of objects"),
+            ({"content": "x" * 1001}, "longer than 1000"),
+            (
+                {"content": "x", "choices": [{"text": "a" * 1001, "correct": True}]},
+                "choice text is longer than 1000",
+            ),
+        ]
+        for record, message in cases:
+            with self.subTest(message=message):
+                with self.assertRaisesMessage(QuestionImportError, message):
+                    import_questions(self.target, [record])
+
+    def test_unreadable_files_are_reported(self):
+        cases = [
+            ("json", [b'{"content": "caf\xe9"}\n'], "Line 1: the file is not UTF-8"),
+            ("csv", [b"question,content\n", b"1,caf\xe9\n"], "Line 2"),
+            ("csv", ["question,content\n", "1," + "x" * 200000 + "\n"], "Line 2"),
+        ]
+        for file_format, lines, message in cases:
+            with self.subTest(lines=lines):
+                with self.assertRaisesMessage(QuestionImportError, message):
+                    import_questions(self.target, READERS[file_format](lines))
+
+
+class TimedSittingTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.quiz.time_limit = 10
+        self.quiz.save()
+
+    def expire(self, *sittings):
+        Sitting.objects.filter(pk__in=[s.pk for s in sittings]).update(
+            deadline=now() - timedelta(minutes=5)
+        )
+
+    def test_new_sitting_gets_deadline(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+
+        self.assertAlmostEqual(
+            sitting.deadline, now() + timedelta(minutes=10), delta=timedelta(minutes=1)
+        )
+        self.assertFalse(sitting.is_expired)
+
+    def test_sweeper_closes_expired_sittings_in_batches(self):
+        sittings = [
+            Sitting.objects.new_sitting(
+                User.objects.create_user(username=f"student{number}"),
+                self.quiz,
+                self.course,
+            )
+            for number in range(3)
+        ]
+        self.expire(*sittings[:2])
+
+        out = StringIO()
+        with self.assertNumQueries(5):
+            call_command("close_expired_sittings", "--batch-size=1", stdout=out)
+
+        self.assertIn("Closed 2 expired sittings", out.getvalue())
+        closed = Sitting.objects.filter(complete=True)
+        self.assertEqual(
+            sorted(closed.values_list("pk", flat=True)), [s.pk for s in sittings[:2]]
+        )
+        self.assertTrue(all(s.end == s.deadline for s in closed))
+
+    def test_sweeper_gives_buffered_practice_sittings_longer(self):
+        self.quiz.category = "practice"
+        self.quiz.exam_paper = False
+        self.quiz.save()
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        self.expire(sitting)
+
+        self.assertEqual(sum(Sitting.objects.close_expired()), 0)
+        sitting.refresh_from_db()
+        self.assertFalse(sitting.complete)
+
+        Sitting.objects.filter(pk=sitting.pk).update(
+            deadline=now() - PRACTICE_DEADLINE_GRACE
+        )
+        self.assertEqual(sum(Sitting.objects.close_expired()), 1)
+        sitting.refresh_from_db()
+        self.assertTrue(sitting.complete)
+
+
+class SittingArchiveTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        first, second, third = self.sitting.get_questions()
+        self.sitting.record_answers(
+            [
+                (first, str(self.correct_choice(first).id), True),
+                (second, str(self.wrong_choice(second).id), False),
+                (third, str(self.correct_choice(third).id), True),
+            ]
+        )
+        Sitting.objects.filter(pk=self.sitting.pk).update(
+            end=now() - timedelta(days=200)
+        )
+
+    def test_archive_moves_old_sittings_and_keeps_the_score(self):
+        recent = Sitting.objects.new_sitting(
+            User.objects.create_user(username="recent"), self.quiz, self.course
+        )
+        recent.mark_quiz_complete()
+
+        batches = list(SittingArchive.objects.archive(now() - timedelta(days=100)))
+
+        self.assertEqual(batches, [1])
+        self.assertQuerySetEqual(Sitting.objects.all(), [recent])
+        archived = SittingArchive.objects.get()
+        self.assertEqual(archived.sitting_id, self.sitting.pk)
+        self.assertEqual((archived.current_score, archived.get_max_score), (2, 3))
+        self.assertEqual(archived.get_percent_correct, 67)
+        self.assertEqual(
+            [answer[1:] for answer in archived.get_answers()],
+            [
+                (
+                    self.questions[0].id,
+                    str(self.correct_choice(self.questions[0]).id),
+                    True,
+                ),
+                (
+                    self.questions[1].id,
+                    str(self.wrong_choice(self.questions[1]).id),
+                    False,
+                ),
+                (
+                    self.questions[2].id,
+                    str(self.correct_choice(self.questions[2]).id),
+                    True,
+                ),
+            ],
+        )
+
+    def test_archived_questions_carry_the_answers(self):
+        list(SittingArchive.objects.archive(now()))
+        archived = SittingArchive.objects.get()
+
+        questions = archived.get_questions()
+
+        self.assertEqual([q.id for q in questions], [q.id for q in self.questions])
+        self.assertEqual([q.is_correct for q in questions], [True, False, True])
+        self.assertEqual(
+            questions[1].user_answer, str(self.wrong_choice(self.questions[1]).id)
+        )
+
+    def test_command_archives_before_the_current_session(self):
+        Session.objects.create(session="2026/2027", is_current_session=True)
+
+        out = StringIO()
+        call_command("archive_sittings", "--batch-size=1", stdout=out)
+
+        self.assertIn("Archived 1 sittings", out.getvalue())
+        self.assertFalse(Sitting.objects.exists())
+        self.assertEqual(
+            Progress.objects.new_progress(self.user)
+            .show_archived_exams()
+            .get()
+            .current_score,
+            2,
+        )
+
+    def test_command_requires_a_session(self):
+        with self.assertRaises(CommandError):
+            call_command("archive_sittings", "--session=missing")
+
+    def test_single_attempt_counts_archived_sittings(self):
+        self.quiz.single_attempt = True
+        self.quiz.save()
+        list(SittingArchive.objects.archive(now()))
+
+        self.assertIs(
+            Sitting.objects.user_sitting(self.user, self.quiz, self.course), False
+        )
+
+
+class QuizAttemptAnnotationTests(QuizTestMixin, TestCase):
+    def complete_sitting(self, quiz, score):
+        return Sitting.objects.create(
+            user=self.user,
+            quiz=quiz,
+            course=self.course,
+            question_count=3,
+            current_score=score,
+            complete=True,
+            end=now(),
+        )
+
+    def test_annotates_attempts_best_score_and_lock(self):
+        self.quiz.single_attempt = True
+        self.quiz.save()
+        self.complete_sitting(self.quiz, 1)
+        SittingArchive.objects.create(
+            sitting_id=1000,
+            user=self.user,
+            quiz=self.quiz,
+            course=self.course,
+            question_count=3,
+            current_score=3,
+            seed=1,
+            start=now(),
+            end=now(),
+            answers=b"",
+        )
+        open_quiz = Quiz.objects.create(course=self.course, title="Graphs")
+        Sitting.objects.create(
+            user=self.user, quiz=open_quiz, course=self.course, current_score=0
+        )
+        Quiz.objects.create(course=self.course, title="Trees")
+
+        with self.assertNumQueries(1):
+            quizzes = {
+                quiz.title: (
+                    quiz.attempts,
+                    quiz.best_score,
+                    quiz.in_progress,
+                    quiz.locked,
+                )
+                for quiz in Quiz.objects.with_user_attempts(self.user)
+            }
+
+        self.assertEqual(
+            quizzes,
+            {
+                "Sorting": (2, 3, False, True),
+                "Graphs": (0, 0, True, False),
+                "Trees": (0, 0, False, False),
+            },
+        )
+
+    @page_settings
+    def test_quiz_index_queries_do_not_grow_with_quizzes(self):
+        self.client.force_login(self.user)
+        url = reverse("quiz_index", kwargs={"slug": self.course.slug})
+        self.complete_sitting(self.quiz, 2)
+        with CaptureQueriesContext(connection) as one_quiz:
+            self.client.get(url)
+
+        for title in ("Graphs", "Trees", "Heaps"):
+            quiz = Quiz.objects.create(course=self.course, title=title)
+            self.complete_sitting(quiz, 1)
+        with CaptureQueriesContext(connection) as four_quizzes:
+            response = self.client.get(url)
+
+        self.assertEqual(len(four_quizzes), len(one_quiz))
+        self.assertContains(response, "best score")
+
+    @page_settings
+    def test_progress_page_lists_attempted_quizzes(self):
+        self.client.force_login(self.user)
+        self.complete_sitting(self.quiz, 2)
+        Quiz.objects.create(course=self.course, title="Untouched")
+
+        response = self.client.get(reverse("quiz_progress"))
+
+        self.assertEqual(
+            [quiz.title for quiz in response.context["quiz_attempts"]], ["Sorting"]
+        )
+
+
+@page_settings
+class ProgressExamsTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.quiz.pass_mark = 50
+        self.quiz.save()
+        ended = now()
+        # Pairs of sittings share an end time to exercise the pk tie-break.
+        Sitting.objects.bulk_create(
+            Sitting(
+                user=self.user,
+                quiz=self.quiz,
+                course=self.course,
+                question_count=3,
+                current_score=number % 4,
+                complete=True,
+                end=ended - timedelta(minutes=number // 2),
+            )
+            for number in range(30)
+        )
+        self.client.force_login(self.user)
+
+    def test_exams_are_keyset_paginated_by_end(self):
+        url = reverse("quiz_progress")
+        seen = []
+        response = self.client.get(url)
+        while True:
+            seen += [exam.pk for exam in response.context["exams"]]
+            if "next_before" not in response.context:
+                break
+            response = self.client.get(url, {"before": response.context["next_before"]})
+
+        expected = Sitting.objects.order_by("-end", "-pk").values_list("pk", flat=True)
+        self.assertEqual(seen, list(expected))
+        self.assertEqual(response.context["exams_counter"], 30)
+
+    def test_rollup_totals_pass_rate_and_is_cached(self):
+        progress = Progress.objects.new_progress(self.user)
+
+        with self.assertNumQueries(2):
+            rollup = progress.exam_rollup()
+        with self.assertNumQueries(0):
+            progress.exam_rollup()
+
+        # Scores cycle 0, 1, 2, 3 out of 3; 2 and 3 reach the 50% pass mark.
+        self.assertEqual(
+            rollup,
+            [
+                {
+                    "quiz": "Sorting",
+                    "sittings": 30,
+                    "passed": 14,
+                    "pass_rate": 47,
+                    "average": 48,
+                }
+            ],
+        )
+
+
+class ProgressScoreTests(QuizTestMixin, TestCase):
+    def test_add_score_increments_in_place(self):
+        ProgressScore.objects.add_score(self.user, self.quiz, 1, 1)
+        with self.assertNumQueries(1):
+            ProgressScore.objects.add_score(self.user, self.quiz, 0, 1)
+
+        score = ProgressScore.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((score.score, score.possible), (1, 2))
+
+    def test_list_all_cat_scores_aggregates_by_category(self):
+        other = Quiz.objects.create(course=self.course, title="Graphs", category="exam")
+        ProgressScore.objects.add_score(self.user, self.quiz, 3, 4)
+        ProgressScore.objects.add_score(self.user, other, 1, 4)
+        progress = Progress.objects.new_progress(self.user)
+
+        with self.assertNumQueries(1):
+            cat_scores = progress.list_all_cat_scores()
+
+        self.assertEqual(cat_scores, {"Exam": [4, 4, 50]})
+
+
+@page_settings
+class QuizTakeTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+
+    def test_answer_query_count(self):
+        self.client.get(self.url)
+        first, second = self.questions[:2]
+        self.client.post(self.url, {"answers": self.correct_choice(first).id})
+        guess = self.correct_choice(second).id
+
+        with self.assertNumQueries(9):
+            response = self.client.post(self.url, {"answers": guess})
+
+        self.assertEqual(response.status_code, 200)
+        sitting = Sitting.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(sitting.current_score, 2)
+        self.assertEqual(sitting.progress(), (2, 3))
+
+    def test_answers_after_deadline_are_not_recorded(self):
+        self.quiz.time_limit = 5
+        self.quiz.save()
+        self.client.get(self.url)
+        sitting = Sitting.objects.get(user=self.user, quiz=self.quiz)
+        Sitting.objects.filter(pk=sitting.pk).update(
+            deadline=now() - timedelta(minutes=1)
+        )
+
+        response = self.client.post(
+            self.url, {"answers": self.correct_choice(self.questions[0]).id}
+        )
+
+        self.assertTemplateUsed(response, "quiz/result.html")
+        self.assertContains(response, "Time is up")
+        sitting.refresh_from_db()
+        self.assertTrue(sitting.complete)
+        self.assertEqual(sitting.current_score, 0)
+
+    def test_timer_submits_once_and_not_within_the_grace_period(self):
+        self.quiz.time_limit = 5
+        self.quiz.save()
+
+        response = self.client.get(self.url)
+        self.assertContains(response, 'data-submit-form="question-form"')
+        self.assertContains(response, 'id="question-form"')
+        self.assertNotContains(response, "location.reload")
+
+        Sitting.objects.filter(user=self.user).update(
+            deadline=now() - DEADLINE_GRACE / 2
+        )
+        response = self.client.get(self.url)
+
+        self.assertTemplateUsed(response, "quiz/question.html")
+        self.assertContains(response, 'data-seconds="0"')
+        self.assertNotContains(response, "data-submit-form")
+        self.assertNotContains(response, "location.reload")
+
+    def test_completing_quiz_renders_result(self):
+        self.client.get(self.url)
+        for question in self.questions:
+            response = self.client.post(
+                self.url, {"answers": self.wrong_choice(question).id}
+            )
+
+        self.assertTemplateUsed(response, "quiz/result.html")
+        sitting = Sitting.objects.get(user=self.user, quiz=self.quiz)
+        self.assertTrue(sitting.complete)
+        self.assertEqual(sitting.current_score, 0)
+        self.assertEqual(
+            sitting.get_incorrect_questions, [q.id for q in self.questions]
+        )
+
+
+@page_settings
+class SinglePageQuizTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.quiz.single_page = True
+        self.quiz.save()
+        self.client.force_login(self.user)
+        self.url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+
+    def test_renders_all_questions(self):
+        response = self.client.get(self.url)
+
+        self.assertTemplateUsed(response, "quiz/quiz_page.html")
+        for question in self.questions:
+            self.assertContains(response, question.content)
+
+    def test_single_post_grades_and_completes_sitting(self):
+        self.client.get(self.url)
+        first, second, third = self.questions
+        data = {
+            f"question_{first.id}": self.correct_choice(first).id,
+            f"question_{second.id}": self.wrong_choice(second).id,
+            f"question_{third.id}": self.correct_choice(third).id,
+        }
+
+        response = self.client.post(self.url, data)
+
+        self.assertTemplateUsed(response, "quiz/result.html")
+        sitting = Sitting.objects.get(user=self.user, quiz=self.quiz)
+        self.assertTrue(sitting.complete)
+        self.assertEqual(sitting.current_score, 2)
+        self.assertEqual(sitting.progress(), (3, 3))
+        self.assertEqual(sitting.get_incorrect_questions, [second.id])
+        score = ProgressScore.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((score.score, score.possible), (2, 3))
+
+
+class PendingAnswerTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+
+    def test_buffered_answers_are_written_on_flush(self):
+        first, second = self.sitting.get_questions()[:2]
+        guess = str(self.correct_choice(first).id)
+        # Stands in for the session, which stores its data as JSON.
+        session = {}
+        with self.assertNumQueries(0):
+            self.sitting.buffer_answer(session, first, guess, True)
+            self.sitting.buffer_answer(session, second, "x", False)
+        session = json.loads(json.dumps(session))
+
+        sitting = Sitting.objects.get(pk=self.sitting.pk)
+        self.assertEqual(sitting.progress(), (0, 3))
+        sitting.load_pending_answers(session)
+        self.assertEqual((sitting.current_position, sitting.current_score), (2, 1))
+
+        self.assertEqual(sitting.flush_pending_answers(session), (1, 2))
+        sitting.refresh_from_db()
+        self.assertEqual((sitting.current_position, sitting.current_score), (2, 1))
+        self.assertEqual(sitting.get_incorrect_questions, [second.id])
+        self.assertEqual(sitting.load_pending_answers(session), {})
+
+
+@page_settings
+class PracticeQuizTakeTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.quiz.category = "practice"
+        self.quiz.exam_paper = False
+        self.quiz.save()
+        self.client.force_login(self.user)
+        self.url = reverse(
+            "quiz_take", kwargs={"pk": self.course.pk, "slug": self.quiz.slug}
+        )
+
+    def test_answers_are_kept_out_of_the_database_until_completion(self):
+        self.client.get(self.url)
+        first, second, third = self.questions
+        self.client.post(self.url, {"answers": self.correct_choice(first).id})
+        # The next answer may be handled by a worker with an empty cache.
+        cache.clear()
+        self.client.post(self.url, {"answers": self.wrong_choice(second).id})
+        cache.clear()
+
+        sitting = Sitting.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual(sitting.progress(), (0, 3))
+        self.assertFalse(sitting.answers.exclude(is_correct=None).exists())
+        self.assertFalse(ProgressScore.objects.exists())
+
+        response = self.client.post(
+            self.url, {"answers": self.correct_choice(third).id}
+        )
+
+        self.assertTemplateUsed(response, "quiz/result.html")
+        self.assertEqual(response.context["score"], 2)
+        self.assertFalse(Sitting.objects.exists())
+        score = ProgressScore.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((score.score, score.possible), (2, 3))
+
+
+class ItemAnalysisTests(QuizTestMixin, TestCase):
+    def take(self, *correct):
+        user = User.objects.create_user(username=f"user{len(correct)}{correct}")
+        sitting = Sitting.objects.new_sitting(user, self.quiz, self.course)
+        results = []
+        for question, is_correct in zip(sitting.get_questions(), correct):
+            choice = (self.correct_choice if is_correct else self.wrong_choice)(
+                question
+            )
+            results.append((question, str(choice.id), is_correct))
+        sitting.record_answers(results)
+
+    def test_item_statistics_match_masked_correlation(self):
+        presented = np.array([[1, 1, 1], [1, 1, 0], [1, 1, 1], [1, 0, 1]], dtype=bool)
+        scores = np.array([[1, 1, 0], [1, 0, 0], [0, 0, 1], [1, 0, 1]], dtype=float)
+
+        difficulty, discrimination = item_statistics(presented, scores)
+
+        np.testing.assert_allclose(difficulty, [0.75, 1 / 3, 2 / 3])
+        mask = presented[:, 2]
+        rest = (scores.sum(axis=1) - scores[:, 2])[mask]
+        expected = np.corrcoef(scores[mask, 2], rest)[0, 1]
+        self.assertAlmostEqual(discrimination[2], expected)
+
+    def test_analysis_is_cached_until_a_sitting_completes(self):
+        self.take(True, True, False)
+        self.take(False, True, False)
+
+        with self.assertNumQueries(4):
+            analysis = get_item_analysis(self.quiz)
+        with self.assertNumQueries(1):
+            get_item_analysis(self.quiz)
+
+        first = analysis["items"][0]
+        self.assertEqual(analysis["sittings"], 2)
+        self.assertEqual((first["responses"], first["difficulty"]), (2, 0.5))
+        self.assertEqual(
+            [(c["text"], c["count"]) for c in first["choices"]],
+            [("Right", 1), ("Wrong", 1)],
+        )
+
+        self.take(True, True, True)
+        self.assertEqual(get_item_analysis(self.quiz)["sittings"], 3)
+
+
+@page_settings
+class QuizMarkingTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.lecturer = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client.force_login(self.lecturer)
+        self.sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        for question in self.questions:
+            self.sitting.record_answer(
+                question, str(self.correct_choice(question).id), True
+            )
+        self.sitting.mark_quiz_complete()
+
+    def test_marking_detail_renders_answers(self):
+        response = self.client.get(
+            reverse("quiz_marking_detail", kwargs={"pk": self.sitting.pk})
+        )
+
+        self.assertContains(response, "matches answer key", count=3)
+
+    def complete_sittings(self, count):
+        for number in range(count):
+            user = User.objects.create_user(username=f"student{number}")
+            sitting = Sitting.objects.new_sitting(user, self.quiz, self.course)
+            sitting.record_answers(
+                [(question, "x", False) for question in sitting.get_questions()]
+            )
+
+    def test_marking_list_query_count_is_constant(self):
+        url = reverse("quiz_marking")
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.complete_sittings(5)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+
+        sittings = list(response.context["sitting_list"])
+        self.assertEqual(len(sittings), 6)
+        self.assertEqual(
+            [(s.percent, s.passed) for s in sittings[-2:]], [(0, False), (100, True)]
+        )
+
+    def test_listed_percent_rounds_like_the_result_page(self):
+        self.quiz.pass_mark = 33
+        self.quiz.save()
+        cases = [(13, 40, 33), (1, 8, 13), (-1, 3, 0), (3, 2, 100)]
+        for score, count, percent in cases:
+            with self.subTest(score=score, count=count):
+                Sitting.objects.filter(pk=self.sitting.pk).update(
+                    current_score=score, question_count=count
+                )
+                sitting = annotate_result(Sitting.objects.filter(pk=self.sitting.pk))
+                sitting = sitting.select_related("quiz").get()
+
+                self.assertEqual(sitting.percent, percent)
+                self.assertEqual(sitting.get_percent_correct, percent)
+                self.assertEqual(sitting.passed, sitting.check_if_passed)
+
+    def test_marking_list_json_keyset_pages(self):
+        self.complete_sittings(2)
+        url = reverse("quiz_marking_json")
+
+        first = self.client.get(url, {"limit": 2}).json()
+        second = self.client.get(url, {"limit": 2, "before": first["next"]}).json()
+
+        self.assertEqual(len(first["results"]), 2)
+        self.assertEqual(second["results"][0]["id"], self.sitting.pk)
+        self.assertEqual(second["results"][0]["percent"], 100)
+        self.assertIsNone(second["next"])
+
+    def test_question_import_upload(self):
+        upload = SimpleUploadedFile(
+            "bank.csv",
+            b"question,type,content,choice,correct\n"
+            b"1,mc,Pick one,Yes,1\n1,mc,Pick one,No,0\n2,essay,Discuss,,\n",
+        )
+        url = reverse(
+            "quiz_questions_import",
+            kwargs={"slug": self.course.slug, "pk": self.quiz.pk},
+        )
+
+        response = self.client.post(url, {"file": upload, "format": "csv"})
+
+        self.assertRedirects(
+            response,
+            reverse("quiz_index", kwargs={"slug": self.course.slug}),
+            fetch_redirect_response=False,
+        )
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.question_count, 5)
+
+    def test_question_export_streams(self):
+        url = reverse(
+            "quiz_questions_export",
+            kwargs={"slug": self.course.slug, "pk": self.quiz.pk},
+        )
+
+        response = self.client.get(url, {"format": "json"})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"content": "Question 0"', lines[0])
+
+    def test_item_analysis_renders(self):
+        response = self.client.get(
+            reverse("quiz_item_analysis", kwargs={"pk": self.quiz.pk})
+        )
+
+        self.assertContains(response, "Question 0")
+        self.assertEqual(response.context["analysis"]["sittings"], 1)
+
+    def test_bulk_marking_applies_all_decisions(self):
+        first, second, third = self.questions
+        response = self.client.post(
+            reverse("quiz_marking_bulk", kwargs={"pk": self.sitting.pk}),
+            {"qid": [first.id, second.id, third.id], "correct": [second.id]},
+        )
+
+        self.assertRedirects(
+            response,
+            reverse("quiz_marking_detail", kwargs={"pk": self.sitting.pk}),
+            fetch_redirect_response=False,
+        )
+        self.sitting.refresh_from_db()
+        self.assertEqual(self.sitting.current_score, 1)
+        self.assertEqual(self.sitting.get_incorrect_questions, [first.id, third.id])
+
+    def test_unanswered_questions_earn_no_marks(self):
+        first, second, third = self.questions
+        sitting = Sitting.objects.new_sitting(
+            User.objects.create_user(username="timed_out"), self.quiz, self.course
+        )
+        sitting.record_answer(first, str(self.correct_choice(first).id), True)
+        sitting.mark_quiz_complete()
+        url = reverse("quiz_marking_detail", kwargs={"pk": sitting.pk})
+
+        response = self.client.get(url)
+        self.assertContains(response, "unanswered", count=2)
+        self.assertContains(response, "checked", count=1)
+
+        self.client.post(url, {"qid": second.id})
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 1)
+        self.client.post(url, {"qid": first.id})
+        sitting.refresh_from_db()
+        self.assertEqual(sitting.current_score, 0)
+        self.assertEqual(sitting.get_incorrect_questions, [first.id, second.id])
+
+
+@page_settings
+class EssayGradingTests(QuizTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.essay_quiz = Quiz.objects.create(course=self.course, title="Essays")
+        self.essays = []
+        for number in range(2):
+            essay = EssayQuestion.objects.create(content=f"Discuss {number}")
+            essay.quiz.add(self.essay_quiz)
+            self.essays.append(essay)
+        self.sittings = []
+        for number in range(3):
+            user = User.objects.create_user(username=f"writer{number}")
+            sitting = Sitting.objects.new_sitting(user, self.essay_quiz, self.course)
+            sitting.record_answers(
+                [(q, f"Essay {number}", False) for q in sitting.get_questions()]
+            )
+            self.sittings.append(sitting)
+
+    def test_queue_pages_ungraded_essays_by_key(self):
+        with self.assertNumQueries(2):
+            first = SittingAnswer.objects.essay_queue(self.essay_quiz, limit=4)
+            [
+                (answer.sitting.user.username, answer.question.content)
+                for answer in first
+            ]
+        rest = SittingAnswer.objects.essay_queue(
+            self.essay_quiz, after=first[-1].pk, limit=4
+        )
+
+        self.assertEqual(len(first), 4)
+        self.assertEqual(len(rest), 2)
+        self.assertIs(first[0].question, first[2].question)
+
+    def test_grade_essays_updates_scores_and_empties_queue(self):
+        answers = SittingAnswer.objects.essay_queue(self.essay_quiz)
+        decisions = {
+            answer.pk: answer.sitting_id != self.sittings[2].pk for answer in answers
+        }
+
+        graded = SittingAnswer.objects.grade_essays(self.essay_quiz, decisions)
+
+        self.assertEqual(graded, 6)
+        self.assertEqual(SittingAnswer.objects.essay_queue(self.essay_quiz), [])
+        scores = Sitting.objects.filter(quiz=self.essay_quiz).order_by("pk")
+        self.assertEqual([s.current_score for s in scores], [2, 2, 0])
+
+    def test_grade_ignores_answers_of_other_quizzes(self):
+        sitting = Sitting.objects.new_sitting(self.user, self.quiz, self.course)
+        answer = sitting.answers.first()
+
+        graded = SittingAnswer.objects.grade_essays(self.essay_quiz, {answer.pk: True})
+
+        self.assertEqual(graded, 0)
+
+    def test_grade_view_applies_the_page(self):
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="password")
+        )
+        answers = SittingAnswer.objects.essay_queue(self.essay_quiz)
+        url = reverse("quiz_essay_grade", kwargs={"pk": self.essay_quiz.pk})
+
+        response = self.client.post(
+            url,
+            {"answer": [a.pk for a in answers], "correct": [answers[0].pk]},
+        )
+
+        self.assertRedirects(
+            response,
+            reverse("quiz_essay_queue", kwargs={"pk": self.essay_quiz.pk}),
+            fetch_redirect_response=False,
+        )
+        self.sittings[0].refresh_from_db()
+        self.assertEqual(self.sittings[0].current_score, 1)
+        response = self.client.get(
+            reverse("quiz_essay_queue", kwargs={"pk": self.essay_quiz.pk})
+        )
+        self.assertEqual(response.context["answers"], [])
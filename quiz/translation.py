@@ -1,5 +1,5 @@
 from modeltranslation.translator import register, TranslationOptions
-from .models import Quiz, Question, Choice, MCQuestion
+from .models import Quiz, Question, Choice, MCQuestion, EssayQuestion
 
 
 @register(Quiz)
@@ -29,3 +29,8 @@ class ChoiceTranslationOptions(TranslationOptions):
 @register(MCQuestion)
 class MCQuestionTranslationOptions(TranslationOptions):
     pass
+
+
+@register(EssayQuestion)
+class EssayQuestionTranslationOptions(TranslationOptions):
+    pass
@@ -6,15 +6,46 @@ urlpatterns = [
     path("progress/", view=views.QuizUserProgressView.as_view(), name="quiz_progress"),
     # path('marking/<int:pk>/', view=QuizMarkingList.as_view(), name='quiz_marking'),
     path("marking_list/", view=views.QuizMarkingList.as_view(), name="quiz_marking"),
+    path("marking_list/json/", views.quiz_marking_json, name="quiz_marking_json"),
     path(
         "marking/<int:pk>/",
         view=views.QuizMarkingDetail.as_view(),
         name="quiz_marking_detail",
     ),
+    path(
+        "marking/<int:pk>/bulk/",
+        view=views.quiz_marking_bulk,
+        name="quiz_marking_bulk",
+    ),
+    path(
+        "marking/quiz/<int:pk>/essays/",
+        view=views.QuizEssayQueue.as_view(),
+        name="quiz_essay_queue",
+    ),
+    path(
+        "marking/quiz/<int:pk>/essays/grade/",
+        view=views.quiz_essay_grade,
+        name="quiz_essay_grade",
+    ),
+    path(
+        "marking/quiz/<int:pk>/analysis/",
+        view=views.QuizItemAnalysis.as_view(),
+        name="quiz_item_analysis",
+    ),
     path("<int:pk>/<slug>/take/", view=views.QuizTake.as_view(), name="quiz_take"),
     path("<slug>/quiz_add/", views.QuizCreateView.as_view(), name="quiz_create"),
     path("<slug>/<int:pk>/add/", views.QuizUpdateView.as_view(), name="quiz_update"),
     path("<slug>/<int:pk>/delete/", views.quiz_delete, name="quiz_delete"),
+    path(
+        "<slug>/<int:pk>/questions/import/",
+        views.quiz_questions_import,
+        name="quiz_questions_import",
+    ),
+    path(
+        "<slug>/<int:pk>/questions/export/",
+        views.quiz_questions_export,
+        name="quiz_questions_export",
+    ),
     path(
         "mc-question/add/<slug>/<int:quiz_id>/",
         views.MCQuestionCreate.as_view(),
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+# Cached sitting questions only need to outlive a single attempt.
+SITTING_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Answers submitted this long after a sitting's deadline are still accepted,
+# so a page submitted as the timer runs out is not lost in transit.
+DEADLINE_GRACE = timedelta(seconds=30)
+
+# Practice sittings buffer their answers in the student's session, which the
+# sweeper cannot flush, so it leaves them to the student this long after the
+# deadline before closing them with whatever answers reached the database.
+PRACTICE_DEADLINE_GRACE = timedelta(hours=6)
+
+# Progress page rollups may lag behind new results by this long.
+ROLLUP_CACHE_TIMEOUT = 60 * 5
+
+# Buffered practice answers are written to the database this often.
+PENDING_ANSWERS_CHECKPOINT = 10
@@ -1,8 +1,12 @@
+from datetime import datetime
+
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 from django.views.generic import (
     CreateView,
     DetailView,
@@ -18,17 +22,30 @@ from .forms import (
     MCQuestionForm,
     MCQuestionFormSet,
     QuestionForm,
+    QuestionImportForm,
     QuizAddForm,
+    QuizForm,
+)
+from .item_analysis import get_item_analysis
+from .question_bank import (
+    READERS,
+    WRITERS,
+    QuestionImportError,
+    export_questions,
+    import_questions,
 )
 from .models import (
     Course,
     EssayQuestion,
     MCQuestion,
     Progress,
+    ProgressScore,
     Question,
     Quiz,
     Sitting,
+    SittingAnswer,
 )
+from .utils import PENDING_ANSWERS_CHECKPOINT
 
 
 # ########################################################
@@ -91,10 +108,54 @@ def quiz_delete(request, slug, pk):
     return redirect("quiz_index", slug=slug)
 
 
+@login_required
+@lecturer_required
+def quiz_questions_import(request, slug, pk):
+    quiz = get_object_or_404(Quiz, pk=pk)
+    form = QuestionImportForm(request.POST or None, request.FILES or None)
+    if request.method == "POST" and form.is_valid():
+        read = READERS[form.cleaned_data["format"]]
+        try:
+            created = import_questions(quiz, read(form.cleaned_data["file"]))
+        except QuestionImportError as error:
+            messages.error(request, str(error))
+        else:
+            messages.success(request, f"{created} questions imported.")
+            return redirect("quiz_index", slug=slug)
+    return render(
+        request,
+        "quiz/question_import.html",
+        {"form": form, "quiz": quiz, "course": quiz.course},
+    )
+
+
+@login_required
+@lecturer_required
+def quiz_questions_export(request, slug, pk):
+    quiz = get_object_or_404(Quiz, pk=pk)
+    file_format = request.GET.get("format", "csv")
+    if file_format not in WRITERS:
+        file_format = "csv"
+    extension, content_type = {
+        "csv": ("csv", "text/csv"),
+        "json": ("jsonl", "application/jsonl"),
+    }[file_format]
+    filename = f"{quiz.slug}-questions.{extension}"
+    return StreamingHttpResponse(
+        WRITERS[file_format](export_questions(quiz)),
+        content_type=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @login_required
 def quiz_list(request, slug):
     course = get_object_or_404(Course, slug=slug)
-    quizzes = Quiz.objects.filter(course=course).order_by("-timestamp")
+    quizzes = (
+        Quiz.objects.filter(course=course)
+        .with_user_attempts(request.user)
+        .order_by("-timestamp")
+    )
     return render(
         request, "quiz/quiz_list.html", {"quizzes": quizzes, "course": course}
     )
@@ -120,9 +181,7 @@ class MCQuestionCreate(CreateView):
         context = super().get_context_data(**kwargs)
         context["course"] = get_object_or_404(Course, slug=self.kwargs["slug"])
         context["quiz_obj"] = get_object_or_404(Quiz, id=self.kwargs["quiz_id"])
-        context["quiz_questions_count"] = Question.objects.filter(
-            quiz=self.kwargs["quiz_id"]
-        ).count()
+        context["quiz_questions_count"] = context["quiz_obj"].question_count
         if self.request.method == "POST":
             context["formset"] = MCQuestionFormSet(self.request.POST)
         else:
@@ -167,34 +226,129 @@ class MCQuestionCreate(CreateView):
 @method_decorator([login_required], name="dispatch")
 class QuizUserProgressView(TemplateView):
     template_name = "quiz/progress.html"
+    paginate_by = 25
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         progress, _ = Progress.objects.get_or_create(user=self.request.user)
         context["cat_scores"] = progress.list_all_cat_scores
-        context["exams"] = progress.show_exams()
-        context["exams_counter"] = context["exams"].count()
+        exams = progress.show_exams()
+        archived_exams = progress.show_archived_exams()
+        quiz_filter = self.request.GET.get("quiz_filter")
+        if quiz_filter:
+            exams = exams.filter(quiz__title__icontains=quiz_filter)
+            archived_exams = archived_exams.filter(quiz__title__icontains=quiz_filter)
+        user_filter = self.request.GET.get("user_filter")
+        if user_filter and self.request.user.is_superuser:
+            exams = exams.filter(user__username__icontains=user_filter)
+            archived_exams = archived_exams.filter(
+                user__username__icontains=user_filter
+            )
+        cursor = parse_exam_cursor(self.request.GET.get("before", ""))
+        if cursor:
+            exams = exams.before(*cursor)
+
+        exams = list(exams[: self.paginate_by + 1])
+        if len(exams) > self.paginate_by:
+            exams = exams[: self.paginate_by]
+            context["next_before"] = exam_cursor(exams[-1])
+        filters = self.request.GET.copy()
+        filters.pop("before", None)
+        context["filters"] = filters.urlencode()
+        context["exams"] = exams
+        context["archived_exams"] = archived_exams[: self.paginate_by]
+        context["rollup"] = progress.exam_rollup()
+        context["exams_counter"] = sum(row["sittings"] for row in context["rollup"])
+        context["quiz_attempts"] = (
+            Quiz.objects.with_user_attempts(self.request.user)
+            .filter(attempts__gt=0)
+            .select_related("course")
+            .order_by("course__code", "title")
+        )
         return context
 
 
+def exam_cursor(sitting):
+    """Encode the keyset position of a sitting in the exams feed."""
+    return f"{sitting.end.isoformat()}_{sitting.pk}"
+
+
+def parse_exam_cursor(value):
+    end, _sep, pk = value.rpartition("_")
+    try:
+        return datetime.fromisoformat(end), int(pk)
+    except ValueError:
+        return None
+
+
+def marking_queryset(request):
+    """Completed sittings the lecturer may mark, filtered by the query string."""
+    queryset = Sitting.objects.filter(complete=True).with_summary()
+    if not request.user.is_superuser:
+        queryset = queryset.filter(
+            quiz__course__allocated_course__lecturer__pk=request.user.id
+        )
+    quiz_filter = request.GET.get("quiz_filter")
+    if quiz_filter:
+        queryset = queryset.filter(quiz__title__icontains=quiz_filter)
+    user_filter = request.GET.get("user_filter")
+    if user_filter:
+        queryset = queryset.filter(user__username__icontains=user_filter)
+    return queryset.order_by("-pk")
+
+
 @method_decorator([login_required, lecturer_required], name="dispatch")
 class QuizMarkingList(ListView):
     model = Sitting
-    template_name = "quiz/quiz_marking_list.html"
+    template_name = "quiz/sitting_list.html"
+    paginate_by = 50
 
     def get_queryset(self):
-        queryset = Sitting.objects.filter(complete=True)
-        if not self.request.user.is_superuser:
-            queryset = queryset.filter(
-                quiz__course__allocated_course__lecturer__pk=self.request.user.id
+        return marking_queryset(self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        filters = self.request.GET.copy()
+        filters.pop("page", None)
+        context["filters"] = filters.urlencode()
+        if context["is_paginated"]:
+            context["page_range"] = context["paginator"].get_elided_page_range(
+                context["page_obj"].number
             )
-        quiz_filter = self.request.GET.get("quiz_filter")
-        if quiz_filter:
-            queryset = queryset.filter(quiz__title__icontains=quiz_filter)
-        user_filter = self.request.GET.get("user_filter")
-        if user_filter:
-            queryset = queryset.filter(user__username__icontains=user_filter)
-        return queryset
+        return context
+
+
+@login_required
+@lecturer_required
+def quiz_marking_json(request):
+    """
+    Keyset paginated JSON version of the marking list. Pass the ``next``
+    value of a response as ``before`` to fetch the following page.
+    """
+    try:
+        limit = min(max(int(request.GET.get("limit", 100)), 1), 500)
+        before = int(request.GET.get("before", 0))
+    except ValueError:
+        return JsonResponse({"message": "Invalid limit or before."}, status=400)
+
+    queryset = marking_queryset(request)
+    if before:
+        queryset = queryset.filter(pk__lt=before)
+    rows = list(
+        queryset.values(
+            "id",
+            "user__username",
+            "quiz__title",
+            "course__code",
+            "end",
+            "current_score",
+            "question_count",
+            "percent",
+            "passed",
+        )[: limit + 1]
+    )
+    next_before = rows[limit - 1]["id"] if len(rows) > limit else None
+    return JsonResponse({"results": rows[:limit], "next": next_before})
 
 
 @method_decorator([login_required, lecturer_required], name="dispatch")
@@ -206,7 +360,7 @@ class QuizMarkingDetail(DetailView):
         sitting = self.get_object()
         question_id = request.POST.get("qid")
         if question_id:
-            question = Question.objects.get_subclass(id=int(question_id))
+            question = Question(id=int(question_id))
             if int(question_id) in sitting.get_incorrect_questions:
                 sitting.remove_incorrect_question(question)
             else:
@@ -215,10 +369,88 @@ class QuizMarkingDetail(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["questions"] = self.object.get_questions(with_answers=True)
+        answer_key = self.object.quiz.get_answer_key()
+        questions = self.object.get_questions(with_answers=True)
+        for question in questions:
+            question.matches_answer_key = question.check_if_correct(
+                question.user_answer, answer_key=answer_key
+            )
+        context["questions"] = questions
         return context
 
 
+@method_decorator([login_required, lecturer_required], name="dispatch")
+class QuizItemAnalysis(DetailView):
+    model = Quiz
+    template_name = "quiz/item_analysis.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["analysis"] = get_item_analysis(self.object)
+        return context
+
+
+@method_decorator([login_required, lecturer_required], name="dispatch")
+class QuizEssayQueue(DetailView):
+    model = Quiz
+    template_name = "quiz/essay_queue.html"
+    paginate_by = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        after = self.request.GET.get("after", "")
+        answers = SittingAnswer.objects.essay_queue(
+            self.object,
+            after=int(after) if after.isdigit() else 0,
+            limit=self.paginate_by + 1,
+        )
+        if len(answers) > self.paginate_by:
+            answers = answers[: self.paginate_by]
+            context["next_after"] = answers[-1].pk
+        context["answers"] = answers
+        return context
+
+
+@login_required
+@lecturer_required
+@require_POST
+def quiz_essay_grade(request, pk):
+    """
+    Grade every essay answer listed on a page of the queue in one request.
+    Graded answers leave the queue, so the redirect shows the next batch.
+    """
+    quiz = get_object_or_404(Quiz, pk=pk)
+    correct_ids = set(request.POST.getlist("correct"))
+    decisions = {
+        int(answer_id): answer_id in correct_ids
+        for answer_id in request.POST.getlist("answer")
+        if answer_id.isdigit()
+    }
+    graded = SittingAnswer.objects.grade_essays(quiz, decisions)
+    messages.success(request, f"{graded} essay answers graded.")
+    return redirect("quiz_essay_queue", pk=quiz.pk)
+
+
+@login_required
+@lecturer_required
+@require_POST
+def quiz_marking_bulk(request, pk):
+    """
+    Apply the correct/incorrect decision for every listed question of a
+    sitting in one request.
+    """
+    sitting = get_object_or_404(Sitting, pk=pk)
+    correct_ids = set(request.POST.getlist("correct"))
+    decisions = {
+        int(question_id): question_id in correct_ids
+        for question_id in request.POST.getlist("qid")
+        if question_id.isdigit()
+    }
+    sitting.apply_marking(decisions)
+    messages.success(request, "Marking saved.")
+    return redirect("quiz_marking_detail", pk=sitting.pk)
+
+
 # ########################################################
 # Quiz Taking View
 # ########################################################
@@ -233,7 +465,7 @@ class QuizTake(FormView):
     def dispatch(self, request, *args, **kwargs):
         self.quiz = get_object_or_404(Quiz, slug=self.kwargs["slug"])
         self.course = get_object_or_404(Course, pk=self.kwargs["pk"])
-        if not Question.objects.filter(quiz=self.quiz).exists():
+        if not self.quiz.question_count:
             messages.warning(request, "This quiz has no questions available.")
             return redirect("quiz_index", slug=self.course.slug)
 
@@ -246,6 +478,14 @@ class QuizTake(FormView):
                 "You have already completed this quiz. Only one attempt is permitted.",
             )
             return redirect("quiz_index", slug=self.course.slug)
+        if self.quiz.buffers_answers:
+            self.sitting.load_pending_answers(request.session)
+        if self.sitting.is_expired:
+            # Answers arriving after the deadline are not recorded.
+            messages.warning(request, "Time is up. Your quiz has been submitted.")
+            if self.quiz.buffers_answers:
+                self.flush_pending_answers(complete=True)
+            return self.final_result_user()
 
         # Set self.question and self.progress here
         self.question = self.sitting.get_first_question()
@@ -253,33 +493,46 @@ class QuizTake(FormView):
 
         return super().dispatch(request, *args, **kwargs)
 
+    def get_template_names(self):
+        if self.quiz.single_page:
+            return ["quiz/quiz_page.html"]
+        return super().get_template_names()
+
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs["question"] = self.question
+        if self.quiz.single_page:
+            kwargs["questions"] = [
+                question
+                for question in self.sitting.get_questions()
+                if question.position >= self.sitting.current_position
+            ]
+        else:
+            kwargs["question"] = self.question
         return kwargs
 
     def get_form_class(self):
+        if self.quiz.single_page:
+            return QuizForm
         if isinstance(self.question, EssayQuestion):
             return EssayForm
         return self.form_class
 
     def form_valid(self, form):
+        if self.quiz.single_page:
+            self.form_valid_quiz(form)
+            return self.final_result_user()
         self.form_valid_user(form)
-        if not self.sitting.get_first_question():
+        if not self.question:
+            if self.quiz.buffers_answers:
+                self.flush_pending_answers(complete=True)
             return self.final_result_user()
         return super().get(self.request)
 
     def form_valid_user(self, form):
-        progress, _ = Progress.objects.get_or_create(user=self.request.user)
         guess = form.cleaned_data["answers"]
-        is_correct = self.question.check_if_correct(guess)
-
-        if is_correct:
-            self.sitting.add_to_score(1)
-            progress.update_score(self.question, 1, 1)
-        else:
-            self.sitting.add_incorrect_question(self.question)
-            progress.update_score(self.question, 0, 1)
+        is_correct = self.question.check_if_correct(
+            guess, answer_key=self.quiz.get_answer_key()
+        )
 
         if not self.quiz.answers_at_end:
             self.previous = {
@@ -292,13 +545,41 @@ class QuizTake(FormView):
         else:
             self.previous = {}
 
-        self.sitting.add_user_answer(self.question, guess)
-        self.sitting.remove_first_question()
+        if self.quiz.buffers_answers:
+            pending = self.sitting.buffer_answer(
+                self.request.session, self.question, guess, is_correct
+            )
+            if pending >= PENDING_ANSWERS_CHECKPOINT:
+                self.flush_pending_answers()
+        else:
+            ProgressScore.objects.add_score(
+                self.request.user, self.quiz, int(is_correct), 1
+            )
+            self.sitting.record_answer(self.question, guess, is_correct)
 
         # Update self.question and self.progress for the next question
         self.question = self.sitting.get_first_question()
         self.progress = self.sitting.progress()
 
+    def flush_pending_answers(self, complete=False):
+        score, count = self.sitting.flush_pending_answers(
+            self.request.session, complete=complete
+        )
+        if count:
+            ProgressScore.objects.add_score(self.request.user, self.quiz, score, count)
+
+    def form_valid_quiz(self, form):
+        answer_key = self.quiz.get_answer_key()
+        results = [
+            (question, guess, question.check_if_correct(guess, answer_key=answer_key))
+            for question, guess in form.answers()
+        ]
+        score = self.sitting.record_answers(results)
+        ProgressScore.objects.add_score(
+            self.request.user, self.quiz, score, len(results)
+        )
+        self.previous = {}
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["question"] = self.question
@@ -308,10 +589,12 @@ class QuizTake(FormView):
             context["previous"] = self.previous
         if hasattr(self, "progress"):
             context["progress"] = self.progress
+        context["seconds_remaining"] = self.sitting.seconds_remaining
         return context
 
     def final_result_user(self):
-        self.sitting.mark_quiz_complete()
+        if not self.sitting.complete:
+            self.sitting.mark_quiz_complete()
         results = {
             "course": self.course,
             "quiz": self.quiz,
@@ -322,7 +605,7 @@ class QuizTake(FormView):
             "previous": getattr(self, "previous", {}),
         }
 
-        if self.quiz.answers_at_end:
+        if self.quiz.answers_at_end or self.quiz.single_page:
             results["questions"] = self.sitting.get_questions(with_answers=True)
             results["incorrect_questions"] = self.sitting.get_incorrect_questions
 
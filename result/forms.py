@@ -0,0 +1,10 @@
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+
+class GradebookUploadForm(forms.Form):
+    file = forms.FileField(label=_("File"))
+    format = forms.ChoiceField(
+        label=_("Format"),
+        choices=(("csv", "CSV"), ("xlsx", "XLSX")),
+    )
@@ -0,0 +1,140 @@
+"""
+Gradebook files: a course's scores as one row per student.
+
+Columns are ``student`` (the student's username), ``name`` and the
+``SCORE_FIELDS``; any other column, such as the ``total`` and ``grade`` of
+a downloaded gradebook, is ignored on upload.
+"""
+import csv
+from itertools import islice
+from zipfile import BadZipFile
+
+from .models import TakenCourse
+from .scores import SCORE_FIELDS, ScoreSheetError, clean_scores, record_scores
+
+GRADEBOOK_FIELDS = ["student", "name"] + SCORE_FIELDS + ["total", "grade"]
+MAX_REPORTED_ERRORS = 50
+
+
+def read_csv(lines):
+    """Yield ``(line_number, row)`` for every row of a CSV gradebook."""
+    rows = csv.DictReader(_decode(lines))
+    try:
+        _check_columns(rows.fieldnames)
+        for row in rows:
+            yield rows.line_num, row
+    except csv.Error as error:
+        raise ScoreSheetError(f"Line {rows.reader.line_num}: {error}")
+
+
+def read_xlsx(file):
+    """Yield ``(row_number, row)`` for every row of the first sheet."""
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ScoreSheetError("Reading XLSX files requires openpyxl")
+    try:
+        sheet = load_workbook(file, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell or "").strip() for cell in next(rows, ())]
+    except (InvalidFileException, BadZipFile, KeyError, OSError, ValueError):
+        raise ScoreSheetError("The file is not a readable XLSX workbook")
+    _check_columns(header)
+    for number, values in enumerate(rows, start=2):
+        if any(value is not None for value in values):
+            yield number, dict(zip(header, values))
+
+
+def _check_columns(fieldnames):
+    missing = {"student", *SCORE_FIELDS} - set(fieldnames or [])
+    if missing:
+        raise ScoreSheetError(f"Missing columns: {', '.join(sorted(missing))}")
+
+
+def _decode(lines):
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8-sig")
+            except UnicodeDecodeError:
+                raise ScoreSheetError(
+                    f"Line {number}: the file is not UTF-8; save it as CSV UTF-8"
+                )
+        yield line
+
+
+def import_gradebook(course, rows, chunk_size=500, **record_kwargs):
+    """
+    Validate gradebook ``rows`` against the students of ``course``,
+    ``chunk_size`` rows at a time, and record them with ``record_scores``.
+    Nothing is written if any row is invalid. Returns the number of
+    students updated and a list of ``(line_number, message)`` errors.
+    """
+    taken_courses = {}
+    scores = {}
+    errors = []
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        usernames = {str(row.get("student") or "").strip() for _number, row in chunk}
+        found = {
+            taken_course.student.student.username: taken_course
+            for taken_course in TakenCourse.objects.filter(
+                course=course, student__student__username__in=usernames
+            ).select_related("student__student")
+        }
+        for number, row in chunk:
+            username = str(row.get("student") or "").strip()
+            taken_course = found.get(username)
+            try:
+                if taken_course is None:
+                    raise ScoreSheetError(
+                        f"{username or 'Student'} is not in this course"
+                    )
+                if taken_course.pk in scores:
+                    raise ScoreSheetError(f"{username} appears more than once")
+                scores[taken_course.pk] = clean_scores(
+                    [row.get(field) for field in SCORE_FIELDS], username
+                )
+            except ScoreSheetError as error:
+                errors.append((number, str(error)))
+                continue
+            taken_courses[taken_course.pk] = taken_course
+        if len(errors) >= MAX_REPORTED_ERRORS:
+            break
+
+    if errors:
+        return 0, errors[:MAX_REPORTED_ERRORS]
+    updated = record_scores(course, taken_courses.values(), scores, **record_kwargs)
+    return updated, []
+
+
+def export_gradebook(course, chunk_size=500):
+    """Yield the gradebook rows of ``course``, ordered by username."""
+    taken_courses = (
+        TakenCourse.objects.filter(course=course)
+        .select_related("student__student")
+        .order_by("student__student__username")
+    )
+    for taken_course in taken_courses.iterator(chunk_size=chunk_size):
+        user = taken_course.student.student
+        yield [user.username, user.get_full_name] + [
+            getattr(taken_course, field) for field in SCORE_FIELDS + ["total", "grade"]
+        ]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def write_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(GRADEBOOK_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+READERS = {"csv": read_csv, "xlsx": read_xlsx}
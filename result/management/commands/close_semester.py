@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Semester
+from result.models import Result
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes every student's GPA and CGPA for a semester and saves them "
+        "as results; running it again refreshes the same results"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--semester",
+            help="Semester to close (defaults to the current semester)",
+        )
+        parser.add_argument(
+            "--session",
+            help="Session of the semester (defaults to the current semester's)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of students whose results are written per transaction",
+        )
+
+    def handle(self, *args, **options):
+        semester, session = options["semester"], options["session"]
+        if not (semester and session):
+            current = (
+                Semester.objects.filter(is_current_semester=True)
+                .select_related("session")
+                .first()
+            )
+            if current is None:
+                raise CommandError("No current semester; pass --semester and --session")
+            semester = semester or current.semester
+            session = session or (current.session and current.session.session)
+        if not session:
+            raise CommandError("Session not found; pass --session")
+
+        created = updated = 0
+        chunks = Result.objects.close_semester(
+            semester, session, chunk_size=options["chunk_size"]
+        )
+        for chunk_created, chunk_updated in chunks:
+            created += chunk_created
+            updated += chunk_updated
+            self.stdout.write(f"{created + updated} results written")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Closed the {semester} semester of {session}: "
+                f"{created} results created, {updated} updated"
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from result.models import GradeSummary
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes every student's per-semester grade point and credit totals "
+        "from their taken courses"
+    )
+
+    def handle(self, *args, **options):
+        count = GradeSummary.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} grade summaries"))
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from course.models import Course
+from result.models import TakenCourse
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the totals, grades, points and comments of taken courses "
+        "under the current grade boundaries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "course_codes",
+            nargs="*",
+            help="Course codes to regrade (defaults to every course)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the grades that would change without saving anything",
+        )
+
+    def handle(self, *args, **options):
+        taken_courses = TakenCourse.objects.all()
+        codes = options["course_codes"]
+        if codes:
+            found = set(
+                Course.objects.filter(code__in=codes).values_list("code", flat=True)
+            )
+            missing = set(codes) - found
+            if missing:
+                raise CommandError(
+                    f"Course codes do not exist: {', '.join(sorted(missing))}"
+                )
+            taken_courses = taken_courses.filter(course__code__in=codes)
+
+        if options["dry_run"]:
+            changes = (
+                taken_courses.grade_changes()
+                .order_by("course__code", "student__student__username")
+                .values_list(
+                    "course__code", "student__student__username", "grade", "new_grade"
+                )
+            )
+            count = 0
+            for code, username, grade, new_grade in changes.iterator():
+                count += 1
+                self.stdout.write(f"{code} {username}: {grade or '-'} -> {new_grade}")
+            self.stdout.write(self.style.SUCCESS(f"{count} grades would change"))
+            return
+
+        count = taken_courses.regrade()
+        self.stdout.write(self.style.SUCCESS(f"Regraded {count} taken courses"))
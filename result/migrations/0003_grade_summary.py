@@ -0,0 +1,77 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:38
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_grade_summaries(apps, schema_editor):
+    TakenCourse = apps.get_model("result", "TakenCourse")
+    GradeSummary = apps.get_model("result", "GradeSummary")
+    totals = (
+        TakenCourse.objects.values("student_id", "course__level", "course__semester")
+        .annotate(points=Sum("point"), credits=Sum("course__credit"))
+        .order_by()
+    )
+    GradeSummary.objects.bulk_create(
+        (
+            GradeSummary(
+                student_id=row["student_id"],
+                level=row["course__level"],
+                semester=row["course__semester"],
+                points=row["points"],
+                credits=row["credits"],
+            )
+            for row in totals
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_initial"),
+        ("result", "0002_alter_result_level_alter_takencourse_comment_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GradeSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("level", models.CharField(max_length=25, null=True)),
+                ("semester", models.CharField(max_length=200)),
+                (
+                    "points",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=9
+                    ),
+                ),
+                ("credits", models.IntegerField(default=0)),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="accounts.student",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="gradesummary",
+            constraint=models.UniqueConstraint(
+                fields=("student", "level", "semester"), name="unique_grade_summary"
+            ),
+        ),
+        migrations.RunPython(populate_grade_summaries, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 from decimal import Decimal
 from django.conf import settings
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Sum
+from django.db.models.lookups import GreaterThanOrEqual
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.urls import reverse
 
 from accounts.models import Student
@@ -74,6 +78,81 @@ GRADE_POINT_MAPPING = {
 }
 
 
+def score_total():
+    """The sum of a taken course's scores, as a database expression."""
+    return (
+        models.F("assignment")
+        + models.F("mid_exam")
+        + models.F("quiz")
+        + models.F("attendance")
+        + models.F("final_exam")
+    )
+
+
+def grade_for(total):
+    """``GRADE_BOUNDARIES`` as a database expression over ``total``."""
+    return models.Case(
+        *(
+            models.When(GreaterThanOrEqual(total, boundary), then=models.Value(grade))
+            for boundary, grade in GRADE_BOUNDARIES
+        ),
+        default=models.Value(NG),
+        output_field=models.CharField(),
+    )
+
+
+def point_for_grade():
+    """The course credit times the point of the stored grade."""
+    grade_point = models.Case(
+        *(
+            models.When(grade=grade, then=models.Value(Decimal(str(point))))
+            for grade, point in GRADE_POINT_MAPPING.items()
+        ),
+        default=models.Value(Decimal("0")),
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+    )
+    credit = models.Subquery(
+        Course.objects.filter(pk=models.OuterRef("course_id")).values("credit")[:1]
+    )
+    return models.ExpressionWrapper(
+        credit * grade_point,
+        output_field=models.DecimalField(max_digits=5, decimal_places=2),
+    )
+
+
+class TakenCourseQuerySet(models.QuerySet):
+    def grade_changes(self):
+        """
+        The taken courses whose stored grade differs from the one their
+        scores get under the current ``GRADE_BOUNDARIES``, annotated with
+        that ``new_grade``.
+        """
+        return self.annotate(new_grade=grade_for(score_total())).exclude(
+            grade=models.F("new_grade")
+        )
+
+    def regrade(self):
+        """
+        Recompute the total, grade, point and comment of these taken courses
+        in the database with three UPDATE statements, then rebuild their
+        students' grade summaries. Filter on the course or student rather
+        than on the derived fields, which the first UPDATE changes. Returns
+        the number of taken courses regraded.
+        """
+        with transaction.atomic():
+            count = self.update(total=score_total())
+            self.update(grade=grade_for(models.F("total")))
+            self.update(
+                point=point_for_grade(),
+                comment=models.Case(
+                    models.When(grade__in=[F, NG], then=models.Value(FAIL)),
+                    default=models.Value(PASS),
+                ),
+            )
+            GradeSummary.objects.rebuild(student_ids=self.values("student_id"))
+        return count
+
+
 class TakenCourse(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     course = models.ForeignKey(
@@ -105,6 +184,8 @@ class TakenCourse(models.Model):
         choices=COMMENT_CHOICES, max_length=200, blank=True, editable=False
     )
 
+    objects = TakenCourseQuerySet.as_manager()
+
     def get_absolute_url(self):
         return reverse("course_detail", kwargs={"slug": self.course.slug})
 
@@ -139,42 +220,110 @@ class TakenCourse(models.Model):
         grade_point = GRADE_POINT_MAPPING.get(self.grade, 0.0)
         return Decimal(credit) * Decimal(grade_point)
 
-    def save(self, *args, **kwargs):
+    def update_result(self):
+        """Recompute the total, grade, point and comment from the scores."""
         self.total = self.get_total()
         self.grade = self.get_grade()
         self.point = self.get_point()
         self.comment = self.get_comment()
-        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "course_id" in instance.__dict__ and "point" in instance.__dict__:
+            instance._saved_point = (instance.course_id, instance.point)
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.update_result()
+        saved = getattr(self, "_saved_point", None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if saved is None:
+                GradeSummary.objects.add(
+                    self.student_id, self.course, self.point, self.course.credit
+                )
+            elif saved[0] != self.course_id:
+                old_course = Course.objects.get(pk=saved[0])
+                GradeSummary.objects.add(
+                    self.student_id, old_course, -saved[1], -old_course.credit
+                )
+                GradeSummary.objects.add(
+                    self.student_id, self.course, self.point, self.course.credit
+                )
+            elif saved[1] != self.point:
+                GradeSummary.objects.add(
+                    self.student_id, self.course, self.point - saved[1], 0
+                )
+        self._saved_point = (self.course_id, self.point)
 
     def calculate_gpa(self):
         current_semester = Semester.objects.filter(is_current_semester=True).first()
         if not current_semester:
             return Decimal("0.00")
-
-        taken_courses = TakenCourse.objects.filter(
-            student=self.student,
-            course__level=self.student.level,
-            course__semester=current_semester.semester,
+        return GradeSummary.objects.gpa(
+            self.student_id, self.student.level, current_semester.semester
         )
 
-        total_points = sum(tc.point for tc in taken_courses)
-        total_credits = sum(tc.course.credit for tc in taken_courses)
-
-        if total_credits > 0:
-            gpa = total_points / Decimal(total_credits)
-            return round(gpa, 2)
-        return Decimal("0.00")
-
     def calculate_cgpa(self):
-        taken_courses = TakenCourse.objects.filter(student=self.student)
+        return GradeSummary.objects.cgpa(self.student_id)
 
-        total_points = sum(tc.point for tc in taken_courses)
-        total_credits = sum(tc.course.credit for tc in taken_courses)
 
-        if total_credits > 0:
-            cgpa = total_points / Decimal(total_credits)
-            return round(cgpa, 2)
-        return Decimal("0.00")
+class ResultManager(models.Manager):
+    def close_semester(self, semester, session, chunk_size=1000):
+        """
+        Write the ``semester`` results of ``session`` for every student with
+        a taken course of that semester at their level, ``chunk_size``
+        students at a time. GPA and CGPA come from grouped sums of points and
+        course credits; existing results are updated, so closing a semester
+        again only refreshes it. Yields ``(created, updated)`` per chunk.
+        """
+        semester_courses = TakenCourse.objects.filter(
+            course__semester=semester, course__level=models.F("student__level")
+        )
+        student_ids = list(
+            semester_courses.values_list("student_id", flat=True)
+            .distinct()
+            .order_by("student_id")
+        )
+        for start in range(0, len(student_ids), chunk_size):
+            chunk = student_ids[start : start + chunk_size]
+            semester_totals = (
+                semester_courses.filter(student_id__in=chunk)
+                .values("student_id", "student__level")
+                .annotate(points=Sum("point"), credits=Sum("course__credit"))
+                .order_by()
+            )
+            cumulative_totals = {
+                row["student_id"]: row
+                for row in TakenCourse.objects.filter(student_id__in=chunk)
+                .values("student_id")
+                .annotate(points=Sum("point"), credits=Sum("course__credit"))
+                .order_by()
+            }
+            with transaction.atomic():
+                existing = {}
+                for result in self.filter(
+                    student_id__in=chunk, semester=semester, session=session
+                ).select_for_update():
+                    existing.setdefault(result.student_id, result)
+                created, updated = [], []
+                for row in semester_totals:
+                    total = cumulative_totals[row["student_id"]]
+                    result = existing.get(row["student_id"]) or Result(
+                        student_id=row["student_id"], semester=semester, session=session
+                    )
+                    result.level = row["student__level"]
+                    result.gpa = float(
+                        _grade_point_average(row["points"], row["credits"])
+                    )
+                    result.cgpa = float(
+                        _grade_point_average(total["points"], total["credits"])
+                    )
+                    (updated if result.pk else created).append(result)
+                self.bulk_create(created)
+                self.bulk_update(updated, ["level", "gpa", "cgpa"])
+            yield len(created), len(updated)
 
 
 class Result(models.Model):
@@ -185,5 +334,128 @@ class Result(models.Model):
     session = models.CharField(max_length=100, blank=True, null=True)
     level = models.CharField(max_length=25, choices=settings.LEVEL_CHOICES, null=True)
 
+    objects = ResultManager()
+
     def __str__(self):
         return f"Result for {self.student} - Semester: {self.semester}, Level: {self.level}"
+
+
+class GradeSummaryManager(models.Manager):
+    def add(self, student_id, course, points, credits):
+        """
+        Add ``points`` and ``credits`` to the student's totals for the level
+        and semester of ``course``, creating the row on first use.
+        """
+        rows = self.filter(
+            student_id=student_id, level=course.level, semester=course.semester
+        )
+        changes = {
+            "points": models.F("points") + points,
+            "credits": models.F("credits") + credits,
+        }
+        if rows.update(**changes) or credits <= 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    student_id=student_id,
+                    level=course.level,
+                    semester=course.semester,
+                    points=points,
+                    credits=credits,
+                )
+        except IntegrityError:
+            rows.update(**changes)
+
+    def gpa(self, student_id, level, semester):
+        totals = (
+            self.filter(student_id=student_id, level=level, semester=semester)
+            .values_list("points", "credits")
+            .first()
+        )
+        return _grade_point_average(*(totals or (0, 0)))
+
+    def cgpa(self, student_id):
+        totals = self.filter(student_id=student_id).aggregate(
+            points=Sum("points"), credits=Sum("credits")
+        )
+        return _grade_point_average(totals["points"], totals["credits"])
+
+    def rebuild(self, student_ids=None):
+        """
+        Recompute the totals of the given students, or of every student,
+        from their taken courses with one grouped query. Returns the number
+        of rows written.
+        """
+        taken_courses = TakenCourse.objects.all()
+        summaries = self.all()
+        if student_ids is not None:
+            taken_courses = taken_courses.filter(student_id__in=student_ids)
+            summaries = summaries.filter(student_id__in=student_ids)
+        totals = (
+            taken_courses.values("student_id", "course__level", "course__semester")
+            .annotate(points=Sum("point"), credits=Sum("course__credit"))
+            .order_by()
+        )
+        with transaction.atomic():
+            summaries.delete()
+            created = self.bulk_create(
+                (
+                    GradeSummary(
+                        student_id=row["student_id"],
+                        level=row["course__level"],
+                        semester=row["course__semester"],
+                        points=row["points"],
+                        credits=row["credits"],
+                    )
+                    for row in totals
+                ),
+                batch_size=1000,
+            )
+        return len(created)
+
+
+class GradeSummary(models.Model):
+    """
+    A student's running totals of grade points and credits for one level and
+    semester, kept in step with their taken courses so GPA and CGPA are read
+    without loading any course.
+    """
+
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    level = models.CharField(max_length=25, null=True)
+    semester = models.CharField(max_length=200)
+    points = models.DecimalField(
+        max_digits=9, decimal_places=2, default=Decimal("0.00")
+    )
+    credits = models.IntegerField(default=0)
+
+    objects = GradeSummaryManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "level", "semester"],
+                name="unique_grade_summary",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} {self.level} {self.semester}: {self.gpa}"
+
+    @property
+    def gpa(self):
+        return _grade_point_average(self.points, self.credits)
+
+
+def _grade_point_average(points, credits):
+    if not credits:
+        return Decimal("0.00")
+    return round(Decimal(points) / Decimal(credits), 2)
+
+
+@receiver(post_delete, sender=TakenCourse)
+def remove_from_grade_summary(sender, instance, **kwargs):
+    GradeSummary.objects.add(
+        instance.student_id, instance.course, -instance.point, -instance.course.credit
+    )
@@ -0,0 +1,143 @@
+"""
+Bulk entry of course scores from the lecturer's score sheet.
+
+The sheet posts one list of values per taken course, named after the
+taken course id, in the order of ``SCORE_FIELDS``.
+"""
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.models import StudentPerformance
+from analytics.views import update_lecturer_performance
+from .models import GradeSummary, TakenCourse
+
+SCORE_FIELDS = ["assignment", "mid_exam", "quiz", "attendance", "final_exam"]
+RESULT_FIELDS = ["total", "grade", "point", "comment"]
+MAX_SCORE = Decimal("100")
+
+
+class ScoreSheetError(ValueError):
+    pass
+
+
+def parse_score_sheet(data, taken_courses):
+    """
+    Return ``{taken_course_id: {field: Decimal}}`` for every taken course
+    posted in ``data``. Empty cells count as zero.
+    """
+    scores = {}
+    for taken_course in taken_courses:
+        values = data.getlist(str(taken_course.pk))
+        if values:
+            scores[taken_course.pk] = clean_scores(
+                values, taken_course.student.student.username
+            )
+    return scores
+
+
+def clean_scores(values, label):
+    """Validate one row of ``SCORE_FIELDS`` values into Decimals."""
+    if len(values) != len(SCORE_FIELDS):
+        raise ScoreSheetError(f"Incomplete scores for {label}")
+    try:
+        row = {
+            field: Decimal(str(value if value is not None else "").strip() or "0")
+            for field, value in zip(SCORE_FIELDS, values)
+        }
+    except InvalidOperation:
+        raise ScoreSheetError(f"Invalid score for {label}")
+    if any(
+        not value.is_finite() or not 0 <= value <= MAX_SCORE for value in row.values()
+    ):
+        raise ScoreSheetError(f"Score out of range for {label}")
+    return row
+
+
+def record_scores(course, taken_courses, scores, lecturer, semester, academic_year):
+    """
+    Apply parsed ``scores`` to ``taken_courses`` of ``course``, computing the
+    totals, grades and points in memory. The taken courses, the students'
+    grade summaries and performance records are written with bulk queries in
+    one transaction and the lecturer's aggregates are recomputed once. Returns the number of
+    students updated.
+    """
+    changed = []
+    for taken_course in taken_courses:
+        row = scores.get(taken_course.pk)
+        if row is None:
+            continue
+        for field, value in row.items():
+            setattr(taken_course, field, value)
+        taken_course.course = course
+        taken_course.update_result()
+        changed.append(taken_course)
+    if not changed:
+        return 0
+
+    with transaction.atomic():
+        TakenCourse.objects.bulk_update(
+            changed, SCORE_FIELDS + RESULT_FIELDS, batch_size=500
+        )
+        GradeSummary.objects.rebuild(
+            student_ids=[taken_course.student_id for taken_course in changed]
+        )
+        _save_performances(course, changed, semester, academic_year)
+        update_lecturer_performance(
+            lecturer=lecturer,
+            course=course,
+            semester=semester,
+            academic_year=academic_year,
+        )
+    return len(changed)
+
+
+def _save_performances(course, taken_courses, semester, academic_year):
+    existing = {
+        performance.student_id: performance
+        for performance in StudentPerformance.objects.filter(
+            course=course,
+            semester=semester,
+            academic_year=academic_year,
+            student_id__in=[tc.student_id for tc in taken_courses],
+        )
+    }
+    updated_at = timezone.now()
+    to_create = []
+    to_update = []
+    for taken_course in taken_courses:
+        performance = existing.get(taken_course.student_id)
+        if performance is None:
+            performance = StudentPerformance(
+                student_id=taken_course.student_id,
+                course=course,
+                semester=semester,
+                academic_year=academic_year,
+                time_spent_learning=timedelta(0),
+            )
+            to_create.append(performance)
+        else:
+            performance.updated_at = updated_at
+            to_update.append(performance)
+        performance.quiz_average = taken_course.quiz
+        performance.assignment_average = taken_course.assignment
+        performance.attendance_rate = taken_course.attendance
+        performance.participation_score = (
+            taken_course.quiz + taken_course.assignment
+        ) / 2
+        performance.overall_grade = taken_course.total
+    StudentPerformance.objects.bulk_create(to_create, batch_size=500)
+    StudentPerformance.objects.bulk_update(
+        to_update,
+        [
+            "quiz_average",
+            "assignment_average",
+            "attendance_rate",
+            "participation_score",
+            "overall_grade",
+            "updated_at",
+        ],
+        batch_size=500,
+    )
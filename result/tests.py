@@ -1,3 +1,370 @@
-from django.test import TestCase
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import Student
+from analytics.models import LecturerPerformance, StudentPerformance
+from core.models import Semester, Session
+from course.models import Course, Program
+from . import models
+from .models import GradeSummary, Result, TakenCourse
+
+User = get_user_model()
+
+# Render pages without the collected static manifest or a language prefix.
+page_settings = override_settings(
+    LANGUAGE_CODE="en",
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    },
+)
+
+
+class ResultTestMixin:
+    students = 3
+
+    def setUp(self):
+        session = Session.objects.create(session="2026/2027", is_current_session=True)
+        Semester.objects.create(
+            semester="First", is_current_semester=True, session=session
+        )
+        self.program = Program.objects.create(title="Computer Science")
+        self.course = Course.objects.create(
+            title="Algorithms",
+            code="CS101",
+            program=self.program,
+            semester="First",
+            credit=3,
+        )
+        self.taken_courses = []
+        for number in range(self.students):
+            user = User.objects.create_user(
+                username=f"student{number}", password="password", is_student=True
+            )
+            student = Student.objects.create(student=user, program=self.program)
+            self.taken_courses.append(
+                TakenCourse.objects.create(student=student, course=self.course)
+            )
+
+
+@page_settings
+class AddScoreForTests(ResultTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.lecturer = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="password"
+        )
+        self.client.force_login(self.lecturer)
+        self.url = reverse("add_score_for", kwargs={"pk": self.course.pk})
+
+    def score_sheet(self, rows):
+        return {str(tc.pk): row for tc, row in zip(self.taken_courses, rows)}
+
+    def test_scores_are_saved_in_bulk(self):
+        rows = [["10", "20", "10", "5", "40"], ["5", "10", "5", "5", "10"]] + [
+            ["10", "20", "10", "5", "40"]
+        ] * (self.students - 2)
+
+        with self.assertNumQueries(30):
+            response = self.client.post(self.url, self.score_sheet(rows))
+
+        self.assertRedirects(response, self.url, fetch_redirect_response=False)
+        first, second = TakenCourse.objects.order_by("pk")[:2]
+        self.assertEqual((first.total, first.grade, first.comment), (85, "A", "PASS"))
+        self.assertEqual(first.point, Decimal("12.00"))
+        self.assertEqual(
+            (second.total, second.grade, second.comment), (35, "F", "FAIL")
+        )
+        self.assertEqual(StudentPerformance.objects.count(), self.students)
+        performance = LecturerPerformance.objects.get(lecturer=self.lecturer)
+        passed = (self.students - 1) * 100 / self.students
+        self.assertEqual(performance.course_completion_rate, Decimal(f"{passed:.2f}"))
+
+    def test_invalid_score_saves_nothing(self):
+        rows = [["10", "20", "10", "5", "40"], ["x", "", "", "", ""]]
+
+        response = self.client.post(self.url, self.score_sheet(rows))
+
+        self.assertEqual(response.status_code, 200)
+        username = User.objects.get(student=self.taken_courses[1].student).username
+        self.assertContains(response, f"Invalid score for {username}")
+        self.assertFalse(TakenCourse.objects.filter(total__gt=0).exists())
+        self.assertFalse(StudentPerformance.objects.exists())
+
+
+@page_settings
+class LargeClassAddScoreForTests(AddScoreForTests):
+    """The same sheet for a larger class costs the same number of queries."""
+
+    students = 30
+
+    test_invalid_score_saves_nothing = None
+
+
+@page_settings
+class GradebookTests(ResultTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="password")
+        )
+        self.upload_url = reverse("gradebook_upload", kwargs={"pk": self.course.pk})
+        self.download_url = reverse("gradebook_download", kwargs={"pk": self.course.pk})
+
+    def download(self):
+        response = self.client.get(self.download_url)
+        return b"".join(response.streaming_content)
+
+    def upload(self, content):
+        upload = SimpleUploadedFile("gradebook.csv", content)
+        return self.client.post(self.upload_url, {"file": upload, "format": "csv"})
+
+    def test_download_round_trips_through_upload(self):
+        lines = self.download().decode().splitlines()
+        self.assertEqual(len(lines), self.students + 1)
+        edited = [lines[0]] + [
+            line.replace("0.00,0.00,0.00,0.00,0.00", "10,20,10,5,30", 1)
+            for line in lines[1:]
+        ]
+
+        response = self.upload("\n".join(edited).encode())
+
+        self.assertRedirects(
+            response,
+            reverse("add_score_for", kwargs={"pk": self.course.pk}),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            list(TakenCourse.objects.values_list("total", "grade").distinct()),
+            [(Decimal("75.00"), "B+")],
+        )
+        self.assertIn(b"10.00,20.00,10.00,5.00,30.00,75.00,B+", self.download())
+
+    def test_row_errors_are_reported_and_nothing_is_saved(self):
+        username = User.objects.get(student=self.taken_courses[0].student).username
+        content = (
+            "student,assignment,mid_exam,quiz,attendance,final_exam\n"
+            f"{username},10,20,10,5,30\n"
+            "nobody,10,20,10,5,30\n"
+            f"{username},10,20,abc,5,30\n"
+        )
+
+        response = self.upload(content.encode())
+
+        self.assertEqual(
+            response.context["errors"],
+            [
+                (3, "nobody is not in this course"),
+                (4, f"{username} appears more than once"),
+            ],
+        )
+        self.assertFalse(TakenCourse.objects.filter(total__gt=0).exists())
+
+    def test_missing_columns_are_reported(self):
+        response = self.upload(b"student,quiz\nsomeone,10\n")
+
+        self.assertContains(response, "Missing columns: assignment")
+
+    def test_unreadable_files_are_reported(self):
+        response = self.upload(
+            "student,name,assignment,mid_exam,quiz,attendance,final_exam\n"
+            "someone,Andr\xe9,10,20,10,5,30\n".encode("latin-1")
+        )
+        self.assertContains(response, "Line 2: the file is not UTF-8")
+
+        upload = SimpleUploadedFile("gradebook.xlsx", b"not a workbook")
+        response = self.client.post(self.upload_url, {"file": upload, "format": "xlsx"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["messages"])
+        self.assertFalse(TakenCourse.objects.filter(total__gt=0).exists())
+
+
+class GradeSummaryTests(ResultTestMixin, TestCase):
+    students = 1
+
+    def setUp(self):
+        super().setUp()
+        self.taken_course = self.taken_courses[0]
+        self.student = self.taken_course.student
+        self.other_course = Course.objects.create(
+            title="Databases",
+            code="CS102",
+            program=self.program,
+            semester="First",
+            credit=2,
+        )
+
+    def score(self, taken_course, final_exam):
+        taken_course.assignment = 10
+        taken_course.mid_exam = 20
+        taken_course.quiz = 10
+        taken_course.attendance = 5
+        taken_course.final_exam = final_exam
+        taken_course.save()
+
+    def summary(self):
+        return GradeSummary.objects.values_list("points", "credits").get(
+            student=self.student
+        )
+
+    def test_saving_and_deleting_taken_courses_keeps_totals(self):
+        self.score(self.taken_course, 40)
+        self.assertEqual(self.summary(), (Decimal("12.00"), 3))
+
+        other = TakenCourse.objects.create(
+            student=self.student, course=self.other_course
+        )
+        self.score(TakenCourse.objects.get(pk=other.pk), 10)
+        self.assertEqual(self.summary(), (Decimal("16.00"), 5))
+
+        TakenCourse.objects.filter(pk=other.pk).delete()
+        self.assertEqual(self.summary(), (Decimal("12.00"), 3))
+
+    def test_gpa_and_cgpa_are_single_queries(self):
+        self.score(self.taken_course, 40)
+        TakenCourse.objects.create(student=self.student, course=self.other_course)
+        taken_course = TakenCourse.objects.select_related("student").get(
+            pk=self.taken_course.pk
+        )
+
+        with self.assertNumQueries(2):
+            self.assertEqual(taken_course.calculate_gpa(), Decimal("2.40"))
+        with self.assertNumQueries(1):
+            self.assertEqual(taken_course.calculate_cgpa(), Decimal("2.40"))
+
+    def test_rebuild_matches_incremental_totals(self):
+        self.score(self.taken_course, 40)
+        expected = self.summary()
+        GradeSummary.objects.all().delete()
+
+        with self.assertNumQueries(5):
+            self.assertEqual(GradeSummary.objects.rebuild(), 1)
+
+        self.assertEqual(self.summary(), expected)
+
+
+class CloseSemesterTests(ResultTestMixin, TestCase):
+    students = 4
+
+    def setUp(self):
+        super().setUp()
+        Student.objects.update(level="Bachelor")
+        Course.objects.update(level="Bachelor")
+        GradeSummary.objects.rebuild()
+        earlier = Course.objects.create(
+            title="Programming",
+            code="CS100",
+            program=self.program,
+            level="Bachelor",
+            semester="Second",
+            credit=2,
+        )
+        for number, taken_course in enumerate(self.taken_courses):
+            taken_course.refresh_from_db()
+            taken_course.final_exam = 40 + number * 10
+            taken_course.save()
+            TakenCourse.objects.create(
+                student=taken_course.student, course=earlier, final_exam=50
+            )
+
+    def close(self, *args):
+        call_command("close_semester", *args, stdout=StringIO())
+
+    def test_results_match_the_per_student_helpers(self):
+        self.close("--chunk-size=3")
+
+        self.assertEqual(Result.objects.count(), self.students)
+        for taken_course in TakenCourse.objects.filter(course=self.course):
+            result = Result.objects.get(student=taken_course.student)
+            self.assertEqual(
+                (result.semester, result.session, result.level),
+                ("First", "2026/2027", "Bachelor"),
+            )
+            self.assertEqual(result.gpa, float(taken_course.calculate_gpa()))
+            self.assertEqual(result.cgpa, float(taken_course.calculate_cgpa()))
+
+    def test_closing_again_updates_the_same_results(self):
+        self.close()
+        taken_course = TakenCourse.objects.get(pk=self.taken_courses[0].pk)
+        taken_course.final_exam = 100
+        taken_course.save()
+
+        with self.assertNumQueries(8):
+            self.close()
+
+        self.assertEqual(Result.objects.count(), self.students)
+        result = Result.objects.get(student=taken_course.student)
+        self.assertEqual(result.gpa, float(taken_course.calculate_gpa()))
+
+    def test_other_sessions_are_untouched(self):
+        Result.objects.create(
+            student=self.taken_courses[0].student,
+            semester="First",
+            session="2025/2026",
+            gpa=1.0,
+        )
+
+        self.close("--semester=First", "--session=2026/2027")
+
+        self.assertEqual(Result.objects.filter(session="2026/2027").count(), 4)
+        self.assertEqual(Result.objects.get(session="2025/2026").gpa, 1.0)
+
+
+class RegradeResultsTests(ResultTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for number, taken_course in enumerate(self.taken_courses):
+            taken_course.refresh_from_db()
+            taken_course.mid_exam = 20
+            taken_course.final_exam = 30 + number * 10
+            taken_course.save()
+
+    def stored(self):
+        return list(
+            TakenCourse.objects.order_by("pk").values_list(
+                "total", "grade", "point", "comment"
+            )
+        )
+
+    def test_regrade_matches_save(self):
+        expected = self.stored()
+        TakenCourse.objects.update(total=0, grade="", point=0, comment=models.FAIL)
+
+        with self.assertNumQueries(10):
+            self.assertEqual(TakenCourse.objects.regrade(), self.students)
+
+        self.assertEqual(self.stored(), expected)
+        self.assertEqual(
+            sorted(GradeSummary.objects.values_list("points", flat=True)),
+            sorted(row[2] for row in expected),
+        )
+
+    def test_dry_run_lists_changed_grades_only(self):
+        boundaries = [(45, models.A)] + models.GRADE_BOUNDARIES
+        out = StringIO()
+
+        with patch.object(models, "GRADE_BOUNDARIES", boundaries):
+            call_command("regrade_results", "CS101", "--dry-run", stdout=out)
+
+        changed = [tc for tc in self.taken_courses if tc.total >= 45]
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), len(changed) + 1)
+        username = User.objects.get(student=changed[0].student).username
+        self.assertIn(f"CS101 {username}: {changed[0].grade} -> A", lines)
+        self.assertEqual(
+            self.stored(),
+            [(tc.total, tc.grade, tc.point, tc.comment) for tc in self.taken_courses],
+        )
+
+    def test_unknown_course_code(self):
+        with self.assertRaisesMessage(CommandError, "NOPE"):
+            call_command("regrade_results", "NOPE")
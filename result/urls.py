@@ -2,6 +2,8 @@ from django.urls import path
 from .views import (
     add_score,
     add_score_for,
+    gradebook_download,
+    gradebook_upload,
     grade_result,
     assessment_result,
     course_registration_form,
@@ -12,6 +14,16 @@ from .views import (
 urlpatterns = [
     path("manage-score/", add_score, name="add_score"),
     path("manage-score/<int:pk>/", add_score_for, name="add_score_for"),
+    path(
+        "manage-score/<int:pk>/gradebook/",
+        gradebook_upload,
+        name="gradebook_upload",
+    ),
+    path(
+        "manage-score/<int:pk>/gradebook/download/",
+        gradebook_download,
+        name="gradebook_download",
+    ),
     path("grade/", grade_result, name="grade_results"),
     path("assessment/", assessment_result, name="ass_results"),
     path("result/print/<int:id>/", result_sheet_pdf_view, name="result_sheet_pdf_view"),
@@ -1,11 +1,11 @@
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.http import HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.files.storage import FileSystemStorage
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 
 from reportlab.platypus import (
@@ -26,9 +26,11 @@ from course.models import Course
 from accounts.models import Student
 from accounts.decorators import lecturer_required, student_required
 from .models import TakenCourse, Result
+from .forms import GradebookUploadForm
+from .gradebook import READERS, export_gradebook, import_gradebook, write_csv
+from .scores import ScoreSheetError, parse_score_sheet, record_scores
 from analytics.ml_utils import LearnerInsightsGenerator
 from analytics.models import StudentPerformance
-from analytics.views import update_lecturer_performance
 
 from reportlab.graphics.shapes import Drawing, Line, String
 from reportlab.graphics.charts.linecharts import HorizontalLineChart
@@ -78,114 +80,102 @@ def add_score(request):
 @login_required
 @lecturer_required
 def add_score_for(request, pk):
-    """Add score for a student"""
-    try:
-        course = get_object_or_404(Course, pk=pk)
-        print(f"Found course: {course.title} (ID: {course.id})")
-        
-        if request.method == "POST":
-            # Get students through TakenCourse
-            taken_courses = TakenCourse.objects.filter(course=course)
-            students = [tc.student for tc in taken_courses]
-            print(f"Found {len(students)} students for course {course.title}")
-            
-            for student in students:
-                midterm = request.POST.get(f"midterm_{student.id}")
-                final = request.POST.get(f"final_{student.id}")
-                quiz = request.POST.get(f"quiz_{student.id}")
-                assignment = request.POST.get(f"assignment_{student.id}")
-                attendance = request.POST.get(f"attendance_{student.id}")
-                total = request.POST.get(f"total_{student.id}")
-                comment = request.POST.get(f"comment_{student.id}")
-                
-                print(f"Processing scores for student {student.get_full_name()}:")
-                print(f"Quiz: {quiz}, Assignment: {assignment}, Attendance: {attendance}, Total: {total}")
-                
-                # Create or update StudentPerformance record
-                from analytics.models import StudentPerformance
-                from core.models import Semester
-                
-                # Get current semester
-                current_semester = Semester.objects.filter(is_current_semester=True).first()
-                if not current_semester:
-                    messages.error(request, "No active semester found.")
-                    return redirect('manage_score')
-                
-                # Calculate performance metrics
-                quiz_average = float(quiz) if quiz else 0
-                assignment_average = float(assignment) if assignment else 0
-                attendance_rate = float(attendance) if attendance else 0
-                participation_score = (float(quiz) + float(assignment)) / 2 if quiz and assignment else 0
-                overall_grade = float(total) if total else 0
-                
-                # Create or update StudentPerformance record
-                performance, created = StudentPerformance.objects.update_or_create(
-                    student=student,
-                    course=course,
-                    semester=current_semester.semester,
-                    academic_year=str(timezone.now().year),
-                    defaults={
-                        'quiz_average': quiz_average,
-                        'assignment_average': assignment_average,
-                        'attendance_rate': attendance_rate,
-                        'participation_score': participation_score,
-                        'overall_grade': overall_grade,
-                        'resources_accessed': 0,  # This should be updated based on actual resource access
-                        'discussion_participation': 0,  # This should be updated based on actual participation
-                    }
-                )
-                print(f"{'Created' if created else 'Updated'} performance record for {student.get_full_name()}")
-                
-                # Update lecturer performance
-                update_lecturer_performance(
-                    lecturer=request.user,
-                    course=course,
-                    semester=current_semester.semester,
-                    academic_year=str(timezone.now().year)
+    """
+    Shows the score sheet of a course and records the posted scores of
+    every student in one bulk write.
+    """
+    course = get_object_or_404(Course, pk=pk)
+    current_session = Session.objects.filter(is_current_session=True).first()
+    current_semester = Semester.objects.filter(
+        is_current_semester=True, session=current_session
+    ).first()
+    if not current_session or not current_semester:
+        messages.error(request, "No active semester found.")
+        return redirect("add_score")
+
+    taken_courses = list(
+        TakenCourse.objects.filter(course=course)
+        .select_related("student__student")
+        .order_by("student__student__username")
+    )
+    if request.method == "POST":
+        try:
+            scores = parse_score_sheet(request.POST, taken_courses)
+        except ScoreSheetError as error:
+            messages.error(request, str(error))
+        else:
+            updated = record_scores(
+                course,
+                taken_courses,
+                scores,
+                lecturer=request.user,
+                semester=current_semester.semester,
+                academic_year=str(timezone.now().year),
+            )
+            messages.success(request, f"Scores of {updated} students have been saved.")
+            return redirect("add_score_for", pk=course.pk)
+
+    courses = Course.objects.filter(
+        allocated_course__lecturer__pk=request.user.id
+    ).filter(semester=current_semester)
+    context = {
+        "course": course,
+        "courses": courses,
+        "students": taken_courses,
+        "current_session": current_session,
+        "current_semester": current_semester,
+    }
+    return render(request, "result/add_score_for.html", context)
+
+
+@login_required
+@lecturer_required
+def gradebook_upload(request, pk):
+    """Records the scores of a course from an uploaded gradebook file."""
+    course = get_object_or_404(Course, pk=pk)
+    current_semester = Semester.objects.filter(
+        is_current_semester=True, session__is_current_session=True
+    ).first()
+    if not current_semester:
+        messages.error(request, "No active semester found.")
+        return redirect("add_score")
+
+    errors = []
+    form = GradebookUploadForm(request.POST or None, request.FILES or None)
+    if form.is_valid():
+        rows = READERS[form.cleaned_data["format"]](form.cleaned_data["file"])
+        try:
+            updated, errors = import_gradebook(
+                course,
+                rows,
+                lecturer=request.user,
+                semester=current_semester.semester,
+                academic_year=str(timezone.now().year),
+            )
+        except ScoreSheetError as error:
+            messages.error(request, str(error))
+        else:
+            if not errors:
+                messages.success(
+                    request, f"Scores of {updated} students have been saved."
                 )
-                
-                # Update the score in the database
-                score = TakenCourse.objects.filter(student=student, course=course).first()
-                if score:
-                    score.mid_exam = midterm
-                    score.final_exam = final
-                    score.quiz = quiz
-                    score.assignment = assignment
-                    score.attendance = attendance
-                    score.total = total
-                    score.comment = comment
-                    score.save()
-                    print(f"Updated existing score for {student.get_full_name()}")
-                else:
-                    TakenCourse.objects.create(
-                        student=student,
-                        course=course,
-                        mid_exam=midterm,
-                        final_exam=final,
-                        quiz=quiz,
-                        assignment=assignment,
-                        attendance=attendance,
-                        total=total,
-                        comment=comment
-                    )
-                    print(f"Created new score for {student.get_full_name()}")
-            
-            messages.success(request, "Scores have been added successfully!")
-            return redirect('manage_score')
-        
-        # Get students through TakenCourse for GET request
-        taken_courses = TakenCourse.objects.filter(course=course)
-        students = [tc.student for tc in taken_courses]
-        print(f"Found {len(students)} students for course {course.title}")
-        context = {
-            'course': course,
-            'students': students,
-        }
-        return render(request, 'result/add_score.html', context)
-    except Exception as e:
-        print(f"Error in add_score_for: {str(e)}")
-        messages.error(request, f"An error occurred: {str(e)}")
-        return redirect('manage_score')
+                return redirect("add_score_for", pk=course.pk)
+            messages.error(request, "The gradebook has errors; nothing was saved.")
+    context = {"course": course, "form": form, "errors": errors}
+    return render(request, "result/gradebook_upload.html", context)
+
+
+@login_required
+@lecturer_required
+def gradebook_download(request, pk):
+    """Streams the current scores of a course as a CSV gradebook."""
+    course = get_object_or_404(Course, pk=pk)
+    filename = f"{course.code}-gradebook.csv"
+    return StreamingHttpResponse(
+        write_csv(export_gradebook(course)),
+        content_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 # ########################################################
@@ -195,8 +185,10 @@ def add_score_for(request, pk):
 @student_required
 def grade_result(request):
     student = Student.objects.get(student__pk=request.user.id)
-    courses = TakenCourse.objects.filter(student__student__pk=request.user.id).filter(
-        course__level=student.level
+    courses = (
+        TakenCourse.objects.filter(student__student__pk=request.user.id)
+        .filter(course__level=student.level)
+        .select_related("course")
     )
     # total_credit_in_semester = 0
     results = Result.objects.filter(student__student__pk=request.user.id)
@@ -216,21 +208,20 @@ def grade_result(request):
         if i.course.semester == "Second":
             total_sec_semester_credit += int(i.course.credit)
 
-    previousCGPA = 0
-    # previousLEVEL = 0
-    # calculate_cgpa
-    for i in results:
-        previousLEVEL = i.level
-        try:
-            a = Result.objects.get(
-                student__student__pk=request.user.id,
-                level=previousLEVEL,
-                semester="Second",
-            )
-            previousCGPA = a.cgpa
-            break
-        except:
-            previousCGPA = 0
+    # The CGPA carried over is the one at the end of the second semester of
+    # the earliest level that has one.
+    second_semester_cgpa = {}
+    for result in results:
+        if result.semester == "Second":
+            second_semester_cgpa.setdefault(result.level, result.cgpa)
+    previousCGPA = next(
+        (
+            second_semester_cgpa[result.level]
+            for result in results
+            if result.level in second_semester_cgpa
+        ),
+        0,
+    )
 
     context = {
         "courses": courses,